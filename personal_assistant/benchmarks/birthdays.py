@@ -0,0 +1,53 @@
+"""Module providing the benchmark of the batch birthday queries
+
+Run from the personal_assistant directory:
+    python -m benchmarks.birthdays --scale 1m
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+
+from benchmarks.generator import SCALES, generate_book
+from source import birthday_index
+from source.birthday_index import BirthdayIndex
+
+
+def main() -> None:
+    """
+    Function to time building the index and every query, in contacts per second.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scale", choices=SCALES, default="1m")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    book = generate_book(SCALES[args.scale], args.seed)
+    today = date.today()
+    start = time.perf_counter()
+    index = BirthdayIndex(book)
+    built = time.perf_counter() - start
+    backend = "numpy" if birthday_index.numpy is not None else "array"
+    print(f"{len(index.records)} birthdays, {backend}, built in {built * 1000:.2f} ms")
+
+    queries = {
+        "upcoming 7 days": lambda: index.upcoming(today, today + timedelta(days=7)),
+        "upcoming 30 days": lambda: index.upcoming(today, today + timedelta(days=30)),
+        "this month": lambda: index.this_month(today),
+        "age stats": lambda: index.age_stats(today),
+    }
+    for name, query in queries.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            query()
+            best = min(best, time.perf_counter() - start)
+        rate = len(index.records) / best / 1_000_000
+        print(f"{name:<20} {best * 1000:10.2f} ms {rate:10.1f} M contacts/s")
+
+
+if __name__ == "__main__":
+    main()
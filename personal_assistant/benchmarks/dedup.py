@@ -0,0 +1,96 @@
+"""Module providing the benchmark of the duplicate contact detection
+
+Run from the personal_assistant directory:
+    python -m benchmarks.dedup --scale 100k
+
+A generated book gets misspelled copies of some of its contacts; the time to find
+the clusters is printed with how many of the copies were found and how many of the
+clusters are right.
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.generator import SCALES, generate_book
+from source.classes import Record, ValidationError
+from source.dedup import THRESHOLD, find_duplicates
+
+
+def misspell(rng: random.Random, text: str) -> str:
+    """
+    Function to swap two neighbouring letters of a text.
+    """
+    position = rng.randrange(len(text) - 1)
+    return text[:position] + text[position + 1] + text[position] + text[position + 2 :]
+
+
+def copy_of(rng: random.Random, record: Record) -> Record:
+    """
+    Function to create a copy of a contact as it could be entered again: a misspelled
+    name, some of the fields missing, the email written differently.
+    """
+    copy = Record()
+    copy.add_name(misspell(rng, record.name.value))
+    for phone in record.phones:
+        if rng.random() < 0.7:
+            copy.add_phone(phone.value)
+    if record.email is not None and rng.random() < 0.7:
+        copy.add_email(record.email.value.replace(".", "", 1).upper())
+    if record.birthday is not None and rng.random() < 0.8:
+        copy.add_birthday(record.birthday.value.strftime("%d.%m.%Y"))
+    return copy
+
+
+def main() -> None:
+    """
+    Function to time the detection on a generated book with copied contacts.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scale", choices=SCALES, default="100k")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--copies", type=float, default=0.01, help="share of contacts copied"
+    )
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    book = generate_book(SCALES[args.scale], args.seed)
+    rng = random.Random(args.seed)
+    originals = {}
+    for record in rng.sample(list(book.values()), int(len(book) * args.copies)):
+        copy = copy_of(rng, record)
+        try:
+            book.add_record(copy)
+        except ValidationError:
+            continue
+        originals[copy.uid] = record.uid
+
+    start = time.perf_counter()
+    clusters = find_duplicates(book, args.threshold)
+    elapsed = time.perf_counter() - start
+    cluster_of = {
+        record.uid: number
+        for number, cluster in enumerate(clusters)
+        for record in cluster.records
+    }
+    found = sum(
+        copy in cluster_of and cluster_of[copy] == cluster_of.get(original)
+        for copy, original in originals.items()
+    )
+    pairs = {frozenset(pair) for pair in originals.items()}
+    right = sum(
+        frozenset(record.uid for record in cluster.records) in pairs
+        for cluster in clusters
+    )
+    print(f"{len(book)} contacts, {len(originals)} copies")
+    print(f"{'find duplicates':<20} {elapsed * 1000:10.2f} ms")
+    print(f"{'clusters':<20} {len(clusters):10}")
+    print(f"{'copies found':<20} {found / max(len(originals), 1):10.2%}")
+    print(f"{'clusters right':<20} {right / max(len(clusters), 1):10.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Module providing a seeded generator of valid contacts and notes for benchmarks"""
+
+import random
+from datetime import date, timedelta
+
+from source.classes import AddressBook, NoteBook, Notice, Record
+
+FIRST_NAMES = (
+    "Ann",
+    "Bob",
+    "Olivia",
+    "Liam",
+    "Emma",
+    "Noah",
+    "Ava",
+    "Mia",
+    "Lucas",
+    "Sofia",
+    "Mark",
+    "Ivan",
+    "Olena",
+    "Taras",
+    "Iryna",
+    "Petro",
+    "Maria",
+    "Oleh",
+    "Yulia",
+    "Max",
+)
+LAST_NAMES = (
+    "Smith",
+    "Brown",
+    "Wilson",
+    "Taylor",
+    "Clark",
+    "Lewis",
+    "Walker",
+    "Young",
+    "Shevch",
+    "Bondar",
+    "Koval",
+    "Tkachuk",
+    "Kravets",
+    "Oliynyk",
+    "Lysenko",
+)
+STREETS = ("Main", "Oak", "Pine", "Maple", "Cedar", "Khreshchatyk", "Shevchenka")
+CITIES = ("Kyiv", "Lviv", "Odesa", "London", "New-York", "Berlin", "Warsaw")
+WORDS = (
+    "call",
+    "meeting",
+    "project",
+    "buy",
+    "milk",
+    "report",
+    "deadline",
+    "review",
+    "budget",
+    "travel",
+    "ticket",
+    "doctor",
+    "gift",
+    "birthday",
+    "invoice",
+    "plan",
+)
+TAGS = ("work", "home", "family", "urgent", "later", "ideas", "shopping", "travel")
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def suffix(number: int) -> str:
+    """
+    Function to encode a number as a short base-36 string to make names unique.
+
+    :param number: non-negative integer
+    :return: base-36 string
+    """
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    result = ""
+    while True:
+        number, rest = divmod(number, 36)
+        result = digits[rest] + result
+        if not number:
+            return result
+
+
+def generate_record(rng: random.Random, number: int, today: date) -> Record:
+    """
+    Function to create a record passing all field validators.
+
+    :param rng: random generator
+    :param number: sequence number making the name unique
+    :param today: date the birthdays are counted back from
+    :return: record
+    """
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    record = Record()
+    record.add_name(f"{first} {last} {suffix(number)}")
+    for _ in range(rng.randint(0, 2)):
+        record.add_phone(f"+380{rng.randrange(10 ** 9):09d}")
+    if rng.random() < 0.8:
+        record.add_email(f"{first}.{last}{number}@example.com".lower())
+    if rng.random() < 0.7:
+        birthday = today - timedelta(days=rng.randint(366, 99 * 365))
+        record.add_birthday(birthday.strftime("%d.%m.%Y"))
+    if rng.random() < 0.6:
+        record.add_address(
+            f"{rng.randint(1, 300)} {rng.choice(STREETS)} St, {rng.choice(CITIES)}"
+        )
+    return record
+
+
+def generate_notice(rng: random.Random, number: int) -> Notice:
+    """
+    Function to create a notice with up to three tags.
+
+    :param rng: random generator
+    :param number: sequence number making the note unique
+    :return: notice
+    """
+    notice = Notice()
+    words = rng.choices(WORDS, k=rng.randint(3, 12))
+    notice.add_note(f"{' '.join(words)} #{number}")
+    for tag in rng.sample(TAGS, rng.randint(0, 3)):
+        notice.add_tag(tag)
+    return notice
+
+
+def generate_book(size: int, seed: int = 0) -> AddressBook:
+    """
+    Function to create a contact book of the given size.
+
+    :param size: number of records
+    :param seed: seed of the random generator
+    :return: contact book
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    book = AddressBook()
+    for number in range(size):
+        book.add_record(generate_record(rng, number, today))
+    return book
+
+
+def generate_notebook(size: int, seed: int = 0) -> NoteBook:
+    """
+    Function to create a notebook of the given size.
+
+    :param size: number of notes
+    :param seed: seed of the random generator
+    :return: notebook
+    """
+    rng = random.Random(seed)
+    notebook = NoteBook()
+    for number in range(size):
+        notebook.add_notice(generate_notice(rng, number))
+    return notebook
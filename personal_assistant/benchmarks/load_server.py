@@ -0,0 +1,119 @@
+"""Module providing a load test of the local JSON API server
+
+Run from the personal_assistant directory: python -m benchmarks.load_server
+"""
+
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+
+PATHS = (
+    "/contacts",
+    "/contacts/search?field=name&q=ill",
+    "/contacts/search?field=phone&q=0991",
+    "/birthdays?days=30",
+    "/notes",
+)
+
+
+async def client(host: str, port: int, requests: int, latencies: list) -> None:
+    """
+    Function to send requests over one keep-alive connection.
+
+    :param latencies: list collecting the latency of each request in seconds
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    for number in range(requests):
+        path = PATHS[number % len(PATHS)]
+        start = time.perf_counter()
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+        await writer.drain()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b"\r\n":
+                break
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":")[1])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def load(host: str, port: int, clients: int, requests: int) -> list:
+    """
+    Function to run concurrent clients.
+
+    :return: latencies of all requests in seconds
+    """
+    latencies = []
+    await asyncio.gather(
+        *(client(host, port, requests, latencies) for _ in range(clients))
+    )
+    return latencies
+
+
+async def wait_for_server(host: str, port: int) -> None:
+    """
+    Function to wait until the server accepts connections.
+    """
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError("Server did not start")
+
+
+def main() -> None:
+    """
+    Function to run the load test and report requests/sec and latency percentiles.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=200, help="per client")
+    parser.add_argument(
+        "--no-spawn", action="store_true", help="use an already running server"
+    )
+    args = parser.parse_args()
+
+    server = None
+    if not args.no_spawn:
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "bot.py",
+                "serve",
+                "--host",
+                args.host,
+                "--port",
+                str(args.port),
+            ]
+        )
+    try:
+        asyncio.run(wait_for_server(args.host, args.port))
+        start = time.perf_counter()
+        latencies = asyncio.run(load(args.host, args.port, args.clients, args.requests))
+        elapsed = time.perf_counter() - start
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"requests:    {len(latencies)}")
+    print(f"requests/s:  {len(latencies) / elapsed:.0f}")
+    print(f"p50 latency: {statistics.median(latencies) * 1000:.2f} ms")
+    print(f"p99 latency: {p99 * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
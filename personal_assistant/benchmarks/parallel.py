@@ -0,0 +1,82 @@
+"""Module providing the benchmark of the parallel scan against the number of workers
+
+Run from the personal_assistant directory:
+    python -m benchmarks.parallel --scale 1m
+    python -m benchmarks.parallel --scale 100k --workers 1 --workers 2 --workers 4
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.generator import SCALES, generate_book
+from source import parallel
+
+QUERIES = {
+    "search_by_name": "ann",
+    "search_by_phone": "+38067",
+    "search_by_email": "example",
+    "search_by_address": "kyiv",
+}
+
+
+def worker_counts() -> list[int]:
+    """
+    Function to get 1, 2, 4 and so on up to the number of cores.
+    """
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cores:
+        counts.append(cores)
+    return counts
+
+
+def main() -> None:
+    """
+    Function to time every query with each number of workers and print the speedup.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scale", choices=SCALES, default="1m")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        action="append",
+        help="can be repeated (default 1..cores)",
+    )
+    args = parser.parse_args()
+
+    book = generate_book(SCALES[args.scale], args.seed)
+    parallel.THRESHOLD = 0
+    serial = {}
+    print(f"{os.cpu_count()} cores, {len(book)} contacts")
+    for workers in args.workers or worker_counts():
+        start = time.perf_counter()
+        parallel.parallel_scan(book, "search_by_name", "", workers)
+        print(
+            f"{workers:>3} workers  start {(time.perf_counter() - start) * 1000:10.2f} ms"
+        )
+        pool = book.derived.get("pool")
+        assert (pool is not None) == (workers > 1 and parallel.can_fork())
+        for method, value in QUERIES.items():
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                found = parallel.parallel_scan(book, method, value, workers)
+                best = min(best, time.perf_counter() - start)
+            # the searches after the first one run in the same pool
+            assert book.derived.get("pool") is pool
+            speedup = serial.setdefault(method, best) / best
+            print(
+                f"{workers:>3} workers  {method:<20} {best * 1000:10.2f} ms"
+                f"  x{speedup:.2f}  {len(found)} found"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Module providing the benchmark suite of loading, saving, searching and rendering
+
+Run from the personal_assistant directory:
+    python -m benchmarks.run --scale 10k --output results.json
+    python -m benchmarks.run --scale 10k --baseline results.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from unittest import mock
+
+from benchmarks.generator import SCALES, generate_book, generate_notebook
+from source import birthdays, search_contacts, search_notes, storage
+from source.functions import show_all
+
+CONTACT_QUERIES = {
+    "search_contacts_by_name": "ann",
+    "search_contacts_by_phone": "+38067",
+    "search_contacts_by_birthday": "01.01",
+    "search_contacts_by_email": "example",
+    "search_contacts_by_address": "kyiv",
+}
+NOTE_QUERIES = {
+    "search_by_tag": "work",
+    "search_by_text": "report",
+}
+
+
+def measure(function, repeat: int) -> float:
+    """
+    Function to measure the best time of several runs with the output discarded.
+
+    :param function: function without arguments
+    :param repeat: number of runs
+    :return: best time in seconds
+    """
+    best = float("inf")
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def interactive(function, answer: str):
+    """
+    Function to run an interactive search with a fixed answer to input().
+
+    :return: function without arguments
+    """
+
+    def run():
+        with mock.patch("builtins.input", return_value=answer):
+            return function()
+
+    return run
+
+
+def source_files() -> dict:
+    """
+    Function to get the version of every data file of the bot in source/.
+
+    :return: modification time and size by path
+    """
+    versions = {}
+    for directory, subdirectories, files in os.walk("source"):
+        subdirectories[:] = [name for name in subdirectories if name != "__pycache__"]
+        for name in files:
+            stat = os.stat(os.path.join(directory, name))
+            versions[os.path.join(directory, name)] = (stat.st_mtime_ns, stat.st_size)
+    return versions
+
+
+def run_scale(size: int, seed: int, repeat: int) -> dict:
+    """
+    Function to run all benchmarks on generated books of the given size.
+
+    :return: best time in seconds by benchmark name
+    """
+    results = {}
+    start = time.perf_counter()
+    book = generate_book(size, seed)
+    notebook = generate_notebook(size, seed)
+    results["generate"] = time.perf_counter() - start
+
+    before = source_files()
+    with tempfile.TemporaryDirectory() as directory, mock.patch.multiple(
+        storage,
+        BACKUP=os.path.join(directory, "backup.dat"),
+        STORAGE=os.path.join(directory, "storage.dat"),
+        NOTES=os.path.join(directory, "notes.blob"),
+    ):
+        results["saver"] = measure(
+            lambda: storage.saver(book, notebook, "overwrite"), repeat
+        )
+        results["loader"] = measure(storage.loader, repeat)
+        # saved notes are read back from the blob store in the directory
+
+        for name, query in CONTACT_QUERIES.items():
+            function = getattr(search_contacts, name)
+            results[name] = measure(interactive(lambda: function(book), query), repeat)
+
+        for name, query in NOTE_QUERIES.items():
+            function = getattr(search_notes, name)
+            results[name] = measure(
+                interactive(lambda: function(notebook), query), repeat
+            )
+
+        today = date.today()
+        end_date = today + timedelta(days=30)
+        results["get_contacts"] = measure(
+            lambda: birthdays.get_contacts(book, today, end_date), repeat
+        )
+        results["show_all_contacts"] = measure(
+            interactive(lambda: show_all(book), ""), 1
+        )
+        results["show_all_notes"] = measure(
+            interactive(lambda: show_all(notebook), ""), 1
+        )
+    # the storage files of the user must not be touched by the run
+    assert source_files() == before, "the benchmark changed files in source/"
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Function to find benchmarks slower than the baseline.
+
+    :param tolerance: allowed slowdown, 0.2 means 20%
+    :return: descriptions of the regressions
+    """
+    regressions = []
+    for scale, timings in results.items():
+        for name, seconds in timings.items():
+            reference = baseline.get(scale, {}).get(name)
+            if (
+                name != "generate"
+                and reference
+                and seconds > reference * (1 + tolerance)
+            ):
+                regressions.append(
+                    f"{scale} {name}: {seconds:.4f}s vs {reference:.4f}s baseline"
+                )
+    return regressions
+
+
+def main() -> None:
+    """
+    Function to run the suite, exits with status 1 on regressions against the baseline.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--scale", choices=SCALES, action="append", help="can be repeated (default 10k)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="file to write the JSON results to")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = {}
+    for scale in args.scale or ["10k"]:
+        results[scale] = run_scale(SCALES[scale], args.seed, args.repeat)
+        for name, seconds in results[scale].items():
+            print(f"{scale:>5} {name:<30} {seconds * 1000:12.2f} ms")
+
+    report = {
+        "python": platform.python_version(),
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
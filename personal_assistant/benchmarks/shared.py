@@ -0,0 +1,102 @@
+"""Module providing the benchmark of searches in the books shared in memory
+
+Run from the personal_assistant directory:
+    python -m benchmarks.shared --scale 100k
+
+The books are exported by this process and searched by a separate reader process,
+compared with unpickling the contact book and scanning the records.
+"""
+
+import argparse
+import pickle
+import subprocess
+import sys
+import time
+
+from benchmarks.generator import SCALES, generate_book, generate_notebook
+from source.shared import SharedBooks, SharedExport
+
+SEGMENT = "qbot_benchmark"
+QUERIES = {
+    "name": "ann",
+    "phone": "+38067",
+    "email": "example",
+    "address": "kyiv",
+}
+
+
+def best_of(repeat: int, function) -> float:
+    """
+    Function to get the shortest time of a few calls, in milliseconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def read(repeat: int) -> None:
+    """
+    Function to time attaching to the books and searching them, run by the reader.
+    """
+    start = time.perf_counter()
+    books = SharedBooks(SEGMENT)
+    print(f"{'attach':<20} {(time.perf_counter() - start) * 1000:10.2f} ms")
+    for field, value in QUERIES.items():
+        found = len(books.search("contacts", field, value))
+        elapsed = best_of(repeat, lambda: books.search("contacts", field, value))
+        print(f"{'shared ' + field:<20} {elapsed:10.2f} ms {found:8} found")
+    books.close()
+
+
+def main() -> None:
+    """
+    Function to export generated books and time a reader process against unpickling.
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scale", choices=SCALES, default="100k")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--read", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.read:
+        read(args.repeat)
+        return
+
+    book = generate_book(SCALES[args.scale], args.seed)
+    notebook = generate_notebook(SCALES[args.scale] // 10, args.seed)
+    export = SharedExport(SEGMENT)
+    start = time.perf_counter()
+    export.refresh(book, notebook)
+    print(
+        f"{len(book)} contacts, {len(notebook)} notes, {export.data.size} bytes, "
+        f"exported in {(time.perf_counter() - start) * 1000:.2f} ms"
+    )
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.shared", "--read"]
+            + ["--repeat", str(args.repeat)],
+            check=True,
+        )
+    finally:
+        export.close()
+
+    raw = pickle.dumps(book.data)
+    start = time.perf_counter()
+    records = list(pickle.loads(raw).values())
+    print(f"{'unpickle':<20} {(time.perf_counter() - start) * 1000:10.2f} ms")
+    for field, value in QUERIES.items():
+        method = f"search_by_{field}"
+        elapsed = best_of(
+            args.repeat,
+            lambda: [record for record in records if getattr(record, method)(value)],
+        )
+        print(f"{'scan ' + field:<20} {elapsed:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Module providing a cold-start benchmark of the bot entry point
+
+Run from the personal_assistant directory: python -m benchmarks.startup
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+TARGET_MS = 150
+IMPORT_TARGET_MS = 40
+LAZY_MODULES = (
+    "asyncio",
+    "copy",
+    "source.birthdays",
+    "source.search_contacts",
+    "source.search_notes",
+    "source.reminders",
+)
+COMMANDS = (
+    ["--help"],
+    ["birthdays", "--days", "7"],
+    ["find", "--name", "ann"],
+)
+# the interactive menu is started and left at once without saving
+INTERACTIVE = "exit\nn\n"
+
+
+def measure(command: list[str], repeat: int, answers: str | None = None) -> float:
+    """
+    Function to measure the median wall-clock time of a bot subcommand.
+
+    :param command: arguments passed to bot.py
+    :param repeat: number of runs
+    :param answers: input typed into the bot, e.g. for the interactive menu
+    :return: median time in milliseconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "bot.py", *command],
+            input=None if answers is None else answers.encode(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def import_times() -> dict[str, float]:
+    """
+    Function to parse the output of "python -X importtime" for the bot module.
+
+    :return: cumulative import time in milliseconds by module name
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import bot"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative) / 1000
+    return times
+
+
+def main() -> None:
+    """
+    Function to run the benchmark, exits with status 1 when the target is exceeded.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--target", type=float, default=TARGET_MS, help="ms")
+    args = parser.parse_args()
+
+    times = import_times()
+    eager = [module for module in LAZY_MODULES if module in times]
+    failed = times["bot"] > IMPORT_TARGET_MS or bool(eager)
+    print(
+        f"{'import bot':<30} {times['bot']:8.1f} ms  {'SLOW' if times['bot'] > IMPORT_TARGET_MS else 'ok'}"
+    )
+    for module in eager:
+        print(f"{module:<30} imported eagerly, must be loaded on first use")
+    for module, cumulative in sorted(times.items(), key=lambda item: -item[1])[1:6]:
+        print(f"  {module:<28} {cumulative:8.1f} ms")
+
+    runs = [(" ".join(command), command, None) for command in COMMANDS]
+    runs.append(("interactive start", [], INTERACTIVE))
+    for name, command, answers in runs:
+        median = measure(command, args.repeat, answers)
+        status = "ok" if median <= args.target else "SLOW"
+        failed = failed or median > args.target
+        print(f"{name:<30} {median:8.1f} ms  {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,100 @@
 """Module providing a console bot assistant with CLI"""
 
-import pickle
+import os
+import sys
 
 from source.classes import AddressBook, NoteBook
 from source.constants import COLUMN_1, SPAN, FIELD, INDENT, SEPARATOR, Color
 from source.functions import get_command, parse_input
+from source.instrumentation import dump_stats, timed_input
+from source.storage import StaleSnapshotError, loader, save_book, save_notebook
 
-BACKUP = "source/backup.dat"
-STORAGE = "source/storage.dat"
 
-
-def loader() -> tuple[AddressBook, NoteBook]:
+def main(argv: list[str] | None = None) -> None:
     """
-    Function to load saved contact book.
+    Function that provides Command Line Interface.
 
-    :return: contact book
+    :param argv: command line arguments, sys.argv is used by default
     """
-    book = AddressBook()
-    try:
-        with open(BACKUP, "rb") as file:
-            book.data = pickle.load(file)
-    except FileNotFoundError:
-        pass
-
-    notebook = NoteBook()
-    try:
-        with open(STORAGE, "rb") as file:
-            notebook.data = pickle.load(file)
-    except FileNotFoundError:
-        pass
-    return (book, notebook)
-
-
-def main() -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    profiler = None
+    if os.environ.get("QBOT_PROFILE") or os.environ.get("QBOT_PROFILE_TOP"):
+        from source.profiling import from_environment
+
+        profiler = from_environment()
+    if not argv:
+        interactive(profiler)
+        return
+
+    from source.daemon import forward
+
+    status = None if profiler else forward(argv)
+    if status is not None:
+        sys.exit(status)
+
+    from source.cli import build_parser, run
+
+    args = build_parser().parse_args(argv)
+    if args.profile or args.profile_top:
+        from source.profiling import Profiler
+
+        profiler = Profiler(args.profile, args.profile_top)
+    if args.command:
+        if profiler:
+            sys.exit(profiler.run(args.command, run, args))
+        sys.exit(run(args))
+    interactive(profiler)
+
+
+@timed_input()
+def interactive(profiler=None) -> None:
     """
-    Function that provides Command Line Interface.
+    Function that provides the interactive menu loop.
+
+    :param profiler: Profiler wrapping each dispatched command, if profiling
     """
     print(SEPARATOR)
     print(Color.GREEN + f"|{'Welcome to the assistant bot!':^{SPAN}}|" + Color.RESET)
     book, notebook = loader()
+    if os.environ.get("QBOT_TRACEMALLOC"):
+        from source.memory import start_tracing
+
+        start_tracing()
     if book.data:
         print(
             Color.GREEN
             + f"|{'Contact book successfully loaded':^{SPAN}}|"
             + Color.RESET
         )
+    from source.reminders import due_today, show_due
+
+    show_due(due_today(book))
+    if os.environ.get("QBOT_REMIND"):
+        from source.reminders import scheduler_of, start_ticking
+
+        start_ticking(scheduler_of(book), float(os.environ["QBOT_REMIND"]))
+    # history and revisions must see every change, searches and tags are loaded on
+    # their first use
+    from source.history import History, session
+
+    history = session["history"] = History(book, notebook)
+    from source.revisions import RevisionLog
+
+    RevisionLog().watch(notebook)
+    from source import searches, tags
+
+    searches.session["books"] = (book, notebook)
+    tags.session["notebook"] = notebook
+    export = None
+    if os.environ.get("QBOT_SHARE"):
+        from source.shared import SharedExport
+
+        try:
+            export = SharedExport()
+        except FileExistsError as exc:
+            print(Color.RED + f"{INDENT}{str(exc):<{FIELD}}|" + Color.RESET)
+        else:
+            export.refresh(book, notebook)
 
     while True:
         plotter()
@@ -64,8 +114,17 @@ def main() -> None:
                 .strip()
             )
             print(SEPARATOR)
+            if export is not None:
+                export.close()
+            if os.environ.get("QBOT_STATS"):
+                dump_stats(os.environ["QBOT_STATS"])
+                print(SEPARATOR)
             if decision in ("y", ""):
                 saver(book, notebook)
+                if searches.session["searches"] is not None:
+                    searches.session["searches"].save()
+                if tags.session["tags"] is not None:
+                    tags.session["tags"].save(notebook.snapshot[0])
                 print(
                     Color.GREEN
                     + f"{INDENT}{'Changes saved, good bye!':<{FIELD}}|"
@@ -77,10 +136,49 @@ def main() -> None:
             print(SEPARATOR)
             break
 
+        handler = get_command(command)
         if command in ("6", "7", "8", "9"):
-            get_command(command)(notebook, *args)
+            handler_args = (notebook, *args)
+        elif command == "memory":
+            handler_args = (book, notebook, *args)
         else:
-            get_command(command)(book, *args)
+            handler_args = (book, *args)
+        if profiler:
+            profiler.run(f"{command}-{handler.__name__}", handler, *handler_args)
+        else:
+            handler(*handler_args)
+        history.checkpoint()
+        if export is not None:
+            export.refresh(book, notebook)
+
+
+def saver(book: AddressBook, notebook: NoteBook) -> None:
+    """
+    Function to save the books, asking how to handle changes of other sessions.
+
+    :param book: contact book
+    :param notebook: notebook
+    """
+    for save, current in ((save_book, book), (save_notebook, notebook)):
+        try:
+            save(current)
+        except StaleSnapshotError:
+            decision = (
+                input(
+                    Color.YELLOW
+                    + f"{INDENT}Storage was changed by another session, merge (Y) or overwrite (N)? [Y]: "
+                    + Color.RESET
+                )
+                .lower()
+                .strip()
+            )
+            conflicts = save(current, "merge" if decision in ("y", "") else "overwrite")
+            for key in conflicts:
+                print(
+                    Color.YELLOW
+                    + f"{INDENT}{f'Changed in both sessions, kept yours: {key}'[:FIELD]:<{FIELD}}|"
+                    + Color.RESET
+                )
 
 
 def plotter() -> None:
@@ -105,19 +203,5 @@ def plotter() -> None:
         print(f"|{key:^{COLUMN_1}}|{value:<{FIELD}}|")
 
 
-def saver(book: AddressBook, notebook: NoteBook) -> None:
-    """
-    Function to save contact book to file.
-
-    :param book: contact book
-    """
-    if book.data:
-        with open(BACKUP, "wb") as file:
-            pickle.dump(book.data, file)
-    if notebook.data:
-        with open(STORAGE, "wb") as file:
-            pickle.dump(notebook.data, file)
-
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,174 @@
+"""Module providing birthdays of a contact book as compact arrays for batch queries"""
+
+import calendar
+from array import array
+from collections import Counter
+from datetime import date, timedelta
+from itertools import accumulate, compress
+
+try:
+    import numpy
+except ImportError:  # the arrays are scanned with map() and compress() instead
+    numpy = None
+
+# day of the year of the first day of every month in a leap year, January is 1
+MONTH_STARTS = (0, *accumulate([1, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30]))
+FEBRUARY_29 = 60
+
+
+def ordinal_of(month: int, day: int) -> int:
+    """
+    Function to get the day of a birthday in a leap year, the same in every year.
+
+    :return: 1 for January 1 up to 366 for December 31
+    """
+    return MONTH_STARTS[month] + day - 1
+
+
+def birthdays_on(day: date) -> list[int]:
+    """
+    Function to get the birthdays celebrated on a date; in other than leap years
+    birthdays on February 29 are celebrated on February 28.
+
+    :return: ordinals of the birthdays
+    """
+    ordinals = [ordinal_of(day.month, day.day)]
+    if (day.month, day.day) == (2, 28) and not calendar.isleap(day.year):
+        ordinals.append(FEBRUARY_29)
+    return ordinals
+
+
+class BirthdayIndex:
+    """
+    A class keeping the birth year, month and day of the year of every contact with
+    a birthday in parallel arrays, in the order of the book.
+
+    The index is built for one generation of the book. Queries turn a date range
+    into the set of days of the year it covers and select the contacts with one
+    pass over the arrays, with NumPy if it is installed.
+    """
+
+    def __init__(self, book):
+        self.book = book
+        self.generation = book.generation
+        self.records = []
+        self.years = array("H")
+        self.months = array("B")
+        self.ordinals = array("H")
+        for record in book.values():
+            if record.birthday is not None:
+                birthday = record.birthday.value
+                self.records.append(record)
+                self.years.append(birthday.year)
+                self.months.append(birthday.month)
+                self.ordinals.append(ordinal_of(birthday.month, birthday.day))
+        self._vectors = None
+
+    def vectors(self) -> tuple:
+        """
+        A method that returns NumPy views of the arrays, without copying them.
+        """
+
+        if self._vectors is None:
+            self._vectors = (
+                numpy.frombuffer(self.years, dtype=numpy.uint16),
+                numpy.frombuffer(self.months, dtype=numpy.uint8),
+                numpy.frombuffer(self.ordinals, dtype=numpy.uint16),
+            )
+        return self._vectors
+
+    def select(self, ordinals: set[int]) -> list:
+        """
+        A method that returns the contacts with a birthday on one of the days.
+        """
+
+        if numpy is not None and self.records:
+            table = numpy.zeros(367, dtype=bool)
+            table[list(ordinals)] = True
+            mask = table[self.vectors()[2]]
+            return [self.records[position] for position in numpy.flatnonzero(mask)]
+        return list(compress(self.records, map(ordinals.__contains__, self.ordinals)))
+
+    def upcoming(self, today: date, end_date: date) -> list:
+        """
+        A method that returns the contacts celebrating a birthday between the dates,
+        including the birthdays of the next year if the range goes past December 31.
+        """
+
+        ordinals = set()
+        day = today
+        while day <= end_date and len(ordinals) < 366:
+            ordinals.update(birthdays_on(day))
+            day += timedelta(days=1)
+        return self.select(ordinals)
+
+    def this_month(self, today: date) -> list:
+        """
+        A method that returns the contacts born in the month of the date.
+        """
+
+        if numpy is not None and self.records:
+            mask = self.vectors()[1] == today.month
+            return [self.records[position] for position in numpy.flatnonzero(mask)]
+        return list(compress(self.records, map(today.month.__eq__, self.months)))
+
+    def age_counts(self, today: date) -> Counter:
+        """
+        A method that returns the number of contacts of every age on the date.
+        """
+
+        ahead = set(range(1, 367))
+        day = date(today.year, 1, 1)
+        while day <= today:
+            ahead.difference_update(birthdays_on(day))
+            day += timedelta(days=1)
+
+        if numpy is not None and self.records:
+            years, _, ordinals = self.vectors()
+            table = numpy.zeros(367, dtype=numpy.int32)
+            table[list(ahead)] = 1
+            ages = today.year - years.astype(numpy.int32) - table[ordinals]
+            return Counter(dict(zip(*numpy.unique(ages, return_counts=True))))
+        born = Counter(self.years)
+        waiting = Counter(compress(self.years, map(ahead.__contains__, self.ordinals)))
+        counts = Counter()
+        for year, count in born.items():
+            counts[today.year - year] += count - waiting[year]
+            counts[today.year - year - 1] += waiting[year]
+        return +counts
+
+    def age_stats(self, today: date) -> dict:
+        """
+        A method that returns the number, the mean, the median and the range of the
+        ages of the contacts on the date.
+        """
+
+        counts = sorted(self.age_counts(today).items())
+        total = sum(count for _, count in counts)
+        if not total:
+            return {"count": 0}
+        seen = 0
+        for median, count in counts:
+            seen += count
+            if seen > total // 2:
+                break
+        return {
+            "count": total,
+            "mean": sum(int(age) * count for age, count in counts) / total,
+            "median": int(median),
+            "youngest": int(counts[0][0]),
+            "oldest": int(counts[-1][0]),
+        }
+
+
+def index_of(book) -> BirthdayIndex:
+    """
+    Function to get the birthday index of a book, rebuilt when the book is changed.
+
+    :param book: AddressBook
+    :return: birthday index
+    """
+    index = book.derived.get("birthdays")
+    if index is None or index.generation != book.generation:
+        index = book.derived["birthdays"] = BirthdayIndex(book)
+    return index
@@ -2,6 +2,7 @@
 
 from datetime import datetime, timedelta, date
 
+from source.birthday_index import index_of
 from source.classes import AddressBook
 from source.constants import COLUMN_1, SEPARATOR, INDENT, HEADER, FIELD
 
@@ -28,7 +29,16 @@ def handle_book(book: AddressBook) -> None:
     :return: None
     """
 
-    days = get_days()
+    show_upcoming(book, get_days())
+
+
+def show_upcoming(book: AddressBook, days: int) -> None:
+    """
+    The method displays contacts with birthdays in the given number of days from today.
+
+    :return: None
+    """
+
     today = datetime.now().date()
     end_date = today + timedelta(days=days)
     contacts = get_contacts(book, today, end_date)
@@ -37,6 +47,51 @@ def handle_book(book: AddressBook) -> None:
     print(
         f"{INDENT}{'Days range ' + today.strftime('%d.%m.%Y') + ' - ' + end_date.strftime('%d.%m.%Y'):<{FIELD}}|"
     )
+    show_contacts(contacts)
+
+
+def show_month(book: AddressBook) -> None:
+    """
+    The method displays contacts born in the current month.
+
+    :return: None
+    """
+
+    today = datetime.now().date()
+    contacts = index_of(book).this_month(today)
+
+    print(SEPARATOR)
+    print(f"{INDENT}{'Birthdays in ' + today.strftime('%B %Y'):<{FIELD}}|")
+    show_contacts(contacts)
+
+
+def show_ages(book: AddressBook) -> None:
+    """
+    The method displays age statistics of contacts with a birthday.
+
+    :return: None
+    """
+
+    stats = index_of(book).age_stats(datetime.now().date())
+
+    print(SEPARATOR)
+    if not stats["count"]:
+        print(f"|{' ' * COLUMN_1}|{'There are no contacts with a birthday':<{FIELD}}|")
+        return
+    line = (
+        f"{stats['count']} contacts, mean age {stats['mean']:.1f}, "
+        f"median {stats['median']}, youngest {stats['youngest']}, "
+        f"oldest {stats['oldest']}"
+    )
+    print(f"{INDENT}{line:<{FIELD}}|")
+
+
+def show_contacts(contacts: list) -> None:
+    """
+    The method displays the found contacts.
+
+    :return: None
+    """
 
     if len(contacts):
         print(SEPARATOR)
@@ -77,12 +132,4 @@ def get_contacts(book: AddressBook, today: date, end_date: date) -> list:
     :return: list
     """
 
-    contacts = []
-    for contact in book.values():
-        if contact.birthday is not None:
-            formatted = datetime(
-                year=today.year, month=contact.birthday.month, day=contact.birthday.day
-            ).date()
-            if today <= formatted <= end_date:
-                contacts.append(contact)
-    return contacts
+    return index_of(book).upcoming(today, end_date)
@@ -0,0 +1,92 @@
+"""Module providing a content-addressed store of note bodies read through mmap"""
+
+import hashlib
+import mmap
+import os
+import struct
+
+from source.locking import file_lock
+
+HEADER = struct.Struct("<16sI")
+
+
+def digest_of(text: str) -> bytes:
+    """
+    Function to compute the content address of a text.
+
+    :param text: note body
+    :return: 16 bytes digest
+    """
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+class BlobStore:
+    """
+    A class storing texts in an append-only file, each text once.
+
+    Every entry is a header with the digest and the length of the text followed by
+    the text in UTF-8; texts are read back by offset and length through mmap.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index = {}
+        self.end = 0
+        self._map = None
+
+    def put(self, text: str) -> tuple[bytes, int, int]:
+        """
+        A method that stores a text unless a text with the same digest is stored.
+
+        :return: digest, offset and length of the text in the file
+        """
+
+        digest = digest_of(text)
+        if digest not in self.index:
+            data = text.encode()
+            with file_lock(self.path, exclusive=True), open(self.path, "ab+") as file:
+                self.scan(file)
+                if digest not in self.index:
+                    file.seek(0, os.SEEK_END)
+                    offset = file.tell() + HEADER.size
+                    file.write(HEADER.pack(digest, len(data)) + data)
+                    self.index[digest] = (offset, len(data))
+                    self.end = offset + len(data)
+        return (digest, *self.index[digest])
+
+    def scan(self, file) -> None:
+        """
+        A method that indexes the entries appended since the last scan, also by
+        other processes.
+        """
+
+        size = file.seek(0, os.SEEK_END)
+        while self.end + HEADER.size <= size:
+            file.seek(self.end)
+            digest, length = HEADER.unpack(file.read(HEADER.size))
+            offset = self.end + HEADER.size
+            if offset + length > size:
+                break
+            self.index[digest] = (offset, length)
+            self.end = offset + length
+
+    def get(self, offset: int, length: int) -> str:
+        """
+        A method that reads a text, mapping the file again if it has grown.
+        """
+
+        if self._map is None or offset + length > len(self._map):
+            if self._map is not None:
+                self._map.close()
+            with open(self.path, "rb") as file:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map[offset : offset + length].decode()
+
+    def close(self) -> None:
+        """
+        A method that unmaps the file, it is mapped again by the next get().
+        """
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
@@ -1,10 +1,29 @@
 """Module providing the classes to manage the contacts in a contact book"""
 
+import os
 import re
+from abc import ABC, abstractmethod
 from collections import UserDict
+from contextlib import contextmanager
 from datetime import datetime
-
-from source.constants import COLUMN_2, COLUMN_3, COLUMN_4, COLUMN_5, COLUMN_6
+from types import MethodType
+
+from source.blobs import digest_of
+from source.constants import COLUMN_2, COLUMN_3, COLUMN_4, COLUMN_5, COLUMN_6, PREVIEW
+from source.events import (
+    BookRestored,
+    FieldSet,
+    PhoneAdded,
+    PhoneChanged,
+    PhoneRemoved,
+    RecordAdded,
+    RecordChanged,
+    RecordRemoved,
+    RecordRenamed,
+    TagAdded,
+    TagChanged,
+    TagRemoved,
+)
 
 
 class ValidationError(Exception):
@@ -146,21 +165,100 @@ class Name(Field):
 class Note(Field):
     """
     A class for storing notes.
+
+    Saved notes keep only the digest, location and preview of the text, the text is
+    read on demand from the blob store the note was saved to or loaded with; the
+    store is not pickled with the note.
     """
 
+    store = None
+
+    @property
+    def value(self):
+        """
+        A method that returns the text, reading it from the store if needed.
+        """
+
+        if self._value is None:
+            if self.store is None:
+                raise LookupError("The note was loaded without its blob store")
+            return self.store.get(self.offset, self.length)
+        return self._value
+
+    @value.setter
+    def value(self, note):
+        """
+        A method that sets the text and its digest and preview.
+        """
+
+        self._value = note
+        self.digest = digest_of(note)
+        self.preview = note if len(note) <= PREVIEW else note[: PREVIEW - 3] + "..."
+        self.offset = None
+        self.length = None
+
+    def offload(self, store) -> None:
+        """
+        A method that moves the text to the blob store.
+        """
+
+        if self.offset is None:
+            _, self.offset, self.length = store.put(self._value)
+            self.store = store
+        self._value = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("store", None)
+        if state["offset"] is not None:
+            state["_value"] = None
+        return state
+
+    def __setstate__(self, state):
+        if "value" in state:
+            self.value = state["value"]
+        else:
+            self.__dict__.update(state)
+
+    def __deepcopy__(self, memo):
+        copy = Note.__new__(Note)
+        copy.__dict__.update(self.__dict__)
+        return copy
+
 
 class Phone(Field):
     """
-    A class for storing a phone number. Has format validation (10 digits).
+    A class for storing a phone number. Has format validation (+ and 12 digits),
+    spaces, dots, dashes and brackets are allowed between the digits.
+
+    The number is kept as an int of its digits, comparisons and searches use this
+    canonical form; the text as entered is kept only if it differs from +XXXXXXXXXXXX.
     """
 
+    DIGITS = 12
+    SEPARATORS = re.compile(r"[\s().-]")
+
+    @classmethod
+    def canonical(cls, phone: str) -> str | None:
+        """
+        A method that returns the digits of a valid phone number, None if invalid.
+        """
+
+        text = cls.SEPARATORS.sub("", phone)
+        digits = text[1:]
+        if text[:1] == "+" and len(digits) == cls.DIGITS and digits.isascii():
+            return digits if digits.isdigit() else None
+        return None
+
     @property
     def value(self):
         """
-        A method that validates phone number.
+        A method that returns the phone number as entered.
         """
 
-        return self._value
+        if self.text is not None:
+            return self.text
+        return f"+{self.digits:0{self.DIGITS}d}"
 
     @value.setter
     def value(self, phone):
@@ -168,9 +266,44 @@ class Phone(Field):
         A method that validates phone number.
         """
 
-        if not re.match(r"\+\d{12}", phone):
+        digits = self.canonical(phone)
+        if digits is None:
             raise ValidationError()
-        self._value = phone
+        self.digits = int(digits)
+        self.text = None if phone == "+" + digits else phone
+
+    def matches(self, query: str) -> bool:
+        """
+        A method that checks whether the digits of a query without separators are a
+        part of the number, its beginning if the query starts with +.
+        """
+
+        if query[:1] == "+":
+            prefix = query[1:]
+            if prefix and not (prefix.isascii() and prefix.isdigit()):
+                return False
+            rest = self.DIGITS - len(prefix)
+            return rest >= 0 and self.digits // 10**rest == int(prefix or 0)
+        return query in f"{self.digits:0{self.DIGITS}d}"
+
+    def __eq__(self, other):
+        if isinstance(other, Phone):
+            return self.digits == other.digits
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.digits)
+
+    def __setstate__(self, state):
+        if "_value" in state:  # files saved before numbers were kept as digits
+            phone = state["_value"]
+            try:
+                self.value = phone
+            except ValidationError:
+                self.digits = int(phone[1 : self.DIGITS + 1])
+                self.text = phone
+        else:
+            self.__dict__.update(state)
 
 
 class Tag(Field):
@@ -179,12 +312,63 @@ class Tag(Field):
     """
 
 
-class Record:
+class Entry:
+    """
+    A base class for records and notices, knowing the book they are in to report
+    their changes to it. The book is not pickled with them.
+    """
+
+    _owner = None
+
+    def emit(self, event_type, **fields) -> None:
+        """
+        A method that reports a change to the book the entry is in.
+        """
+
+        if self._owner is not None:
+            self._owner.emit(event_type, record=self, **fields)
+
+    def set_field(self, field: str, value) -> None:
+        """
+        A method that sets a field and reports it.
+        """
+
+        old = getattr(self, field)
+        setattr(self, field, value)
+        self.emit(FieldSet, field=field, old=old, new=value)
+
+    def snapshot(self) -> dict:
+        """
+        A method that returns a copy of the state to revert to.
+        """
+
+        import copy
+
+        return copy.deepcopy(self.__getstate__())
+
+    def revert(self, state: dict) -> None:
+        """
+        A method that returns to a state taken by snapshot().
+        """
+
+        owner = self._owner
+        self.__dict__.clear()
+        self.__dict__.update(state)
+        self._owner = owner
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_owner", None)
+        return state
+
+
+class Record(Entry):
     """
     A class for storing information about a contact, including name and contacts list.
     """
 
     def __init__(self):
+        self.uid = None
         self.name = Name("__default__")
         self.phones = []
         self.birthday = None
@@ -196,66 +380,74 @@ class Record:
         A method that adds an address to the record.
         """
 
-        self.address = Address(address)
+        self.set_field("address", Address(address))
 
     def add_birthday(self, birthday: str):
         """
         A method that adds a birthday to the record.
         """
 
-        self.birthday = Birthday(birthday)
+        self.set_field("birthday", Birthday(birthday))
 
     def add_email(self, email: str):
         """
         A metod that adds an email to the record.
         """
 
-        self.email = Email(email)
+        self.set_field("email", Email(email))
 
     def add_name(self, name: str):
         """
         A method that adds a name to the record.
         """
 
-        self.name = Name(name)
+        self.set_field("name", Name(name))
 
     def add_phone(self, phone: str):
         """
         A method that adds a new phone number to the record.
         """
 
-        self.phones.append(Phone(phone))
+        self.insert_phone(len(self.phones), Phone(phone))
+
+    def insert_phone(self, index: int, phone: Phone):
+        """
+        A method that inserts a phone number at a position in the record.
+        """
+
+        self.phones.insert(index, phone)
+        self.emit(PhoneAdded, phone=phone, index=index)
 
     def remove_address(self):
         """
         A method that removes the address from the record.
         """
-        self.address = None
+        self.set_field("address", None)
 
     def remove_birthday(self):
         """
         A method that removes the birthday from the record.
         """
-        self.birthday = None
+        self.set_field("birthday", None)
 
     def remove_email(self):
         """
         A method that removes the email from the record.
         """
-        self.email = None
+        self.set_field("email", None)
 
     def remove_phone(self, index: int):
         """
         A method that removes a phone number from the record.
         """
 
-        self.phones.pop(index)
+        self.emit(PhoneRemoved, phone=self.phones.pop(index), index=index)
 
     def modify_phone(self, phone: str, index: int):
         """
         A method that modifies a phone in the record.
         """
-        self.phones[index] = Phone(phone)
+        self.replace_phone(index, Phone(phone))
 
     def edit_phone(self, phones: list):
         """
@@ -263,18 +455,26 @@ class Record:
         """
 
         index = self.find_phone(phones[0])
-        self.phones[index] = Phone(phones[1])
+        self.replace_phone(index, Phone(phones[1]))
+
+    def replace_phone(self, index: int, phone: Phone):
+        """
+        A method that replaces a phone number in the record.
+        """
+
+        old = self.phones[index]
+        self.phones[index] = phone
+        self.emit(PhoneChanged, old=old, new=phone, index=index)
 
     def find_phone(self, phone: str):
         """
         A method that finds an index of the phone number in the record.
         """
 
-        index = 0
-        for item in self.phones:
-            if item.value == phone:
+        digits = Phone.canonical(phone)
+        for index, item in enumerate(self.phones):
+            if digits is not None and item.digits == int(digits):
                 return index
-            index += 1
         raise ValidationError()
 
     def search_by_name(self, name: str):
@@ -290,8 +490,9 @@ class Record:
         The method checks if the phone matches the passed value.
         """
 
+        query = Phone.SEPARATORS.sub("", phone)
         for item in self.phones:
-            if phone in item.value:
+            if item.matches(query):
                 return self
 
     def search_by_birthday(self, birthday: str):
@@ -318,6 +519,19 @@ class Record:
         if address.lower() in str(self.address).lower():
             return self
 
+    def to_dict(self) -> dict:
+        """
+        The method returns the record as a dictionary of strings.
+        """
+
+        return {
+            "name": self.name.value,
+            "phones": [str(item) for item in self.phones],
+            "email": None if self.email is None else str(self.email),
+            "birthday": None if self.birthday is None else str(self.birthday),
+            "address": None if self.address is None else str(self.address),
+        }
+
     def __str__(self) -> str:
         numbers = (
             "; ".join(f"{i + 1}: {p.value}" for i, p in enumerate(self.phones))
@@ -327,35 +541,57 @@ class Record:
         return f"{self.name.value:^{COLUMN_2}}|{str(self.email):^{COLUMN_3}}|{str(numbers):^{COLUMN_4}}|{str(self.birthday):^{COLUMN_5}}|{str(self.address):^{COLUMN_6}}"
 
 
-class Notice:
+class Notice(Entry):
     """
     A class for storing user notes.
+
+    Besides the id in its notebook, which is given again on every load, a notice has
+    a random 64-bit serial saved with it, so its revisions can't be confused with the
+    revisions of another note.
     """
 
     def __init__(self):
-        self.note = Name("__default__")
+        self.uid = None
+        self.serial = self.new_serial()
+        self.note = Note("__default__")
         self.tags = []
 
+    @staticmethod
+    def new_serial() -> int:
+        """
+        A method that returns a random serial for a new notice.
+        """
+
+        return int.from_bytes(os.urandom(8), "little")
+
     def add_note(self, note: str):
         """
         A method that adds a note to notice.
         """
 
-        self.note = Note(note)
+        self.set_field("note", Note(note))
 
     def add_tag(self, tag: str):
         """
         A method that adds a new tag to the notice.
         """
 
-        self.tags.append(Tag(tag))
+        self.insert_tag(len(self.tags), Tag(tag))
+
+    def insert_tag(self, index: int, tag: Tag):
+        """
+        A method that inserts a tag at a position in the notice.
+        """
+
+        self.tags.insert(index, tag)
+        self.emit(TagAdded, tag=tag, index=index)
 
     def remove_tag(self, index: int):
         """
         A method that removes a tag from the notice.
         """
 
-        self.tags.pop(index)
+        self.emit(TagRemoved, tag=self.tags.pop(index), index=index)
 
     def edit_tag(self, tags: list):
         """
@@ -363,7 +599,16 @@ class Notice:
         """
 
         index = self.find_tag(tags[0])
-        self.tags[index] = Tag(tags[1])
+        self.replace_tag(index, Tag(tags[1]))
+
+    def replace_tag(self, index: int, tag: Tag):
+        """
+        A method that replaces a tag in the notice.
+        """
+
+        old = self.tags[index]
+        self.tags[index] = tag
+        self.emit(TagChanged, old=old, new=tag, index=index)
 
     def find_tag(self, tag: str):
         """
@@ -405,7 +650,14 @@ class Notice:
         """
         A method that modifies a tag in the record.
         """
-        self.tags[index] = Tag(tag)
+        self.replace_tag(index, Tag(tag))
+
+    def to_dict(self) -> dict:
+        """
+        The method returns the notice as a dictionary of strings.
+        """
+
+        return {"note": str(self.note), "tags": [str(item) for item in self.tags]}
 
     def __str__(self) -> str:
         numbers = (
@@ -413,62 +665,505 @@ class Notice:
             if self.tags
             else None
         )
-        return f"{str(numbers):^{COLUMN_2 + COLUMN_3 + 1}}|{self.note.value:^{COLUMN_4 + COLUMN_5 + COLUMN_6 + 2}}"
+        return (
+            f"{str(numbers):^{COLUMN_2 + COLUMN_3 + 1}}|{self.note.preview:^{PREVIEW}}"
+        )
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "serial" not in state:  # notes saved before they had serials
+            self.serial = self.new_serial()
 
-class AddressBook(UserDict):
+
+class EditSession:
     """
-    A class for storing and managing records.
+    A class recording changes of a record or a notice without copying it.
+
+    Attributes are read from the original until they are set on the session, lists
+    are copied on first access, and methods of the original act on the session, so
+    the original is changed only by apply().
     """
 
-    def add_record(self, record: Record) -> None:
+    def __init__(self, original: Record | Notice):
+        object.__setattr__(self, "original", original)
+        object.__setattr__(self, "changes", {})
+
+    def __getattr__(self, name: str):
+        if name in self.changes:
+            return self.changes[name]
+        if name == "_owner":  # changes of the session are reported by apply()
+            return None
+        value = getattr(self.original, name)
+        if isinstance(value, list):
+            value = self.changes[name] = list(value)
+        elif isinstance(value, MethodType) and value.__self__ is self.original:
+            value = MethodType(value.__func__, self)
+        return value
+
+    def __setattr__(self, name: str, value) -> None:
+        self.changes[name] = value
+
+    def changed(self) -> dict:
         """
-        A method that adds a record to the address book.
+        A method that returns the attributes that differ from the original; lists are
+        also compared as shown, so reformatting a phone number is a change too.
+        """
+
+        def shown(value):
+            return [str(item) for item in value] if isinstance(value, list) else value
+
+        changed = {}
+        for name, value in self.changes.items():
+            original = getattr(self.original, name)
+            if value != original or shown(value) != shown(original):
+                changed[name] = value
+        return changed
+
+    def apply(self) -> dict:
+        """
+        A method that writes the changed attributes to the original.
+        """
+
+        changed = self.changed()
+        for name, value in changed.items():
+            self.original.set_field(name, value)
+        return changed
+
+    def __str__(self) -> str:
+        return type(self.original).__str__(self)
+
+
+class Journal:
+    """
+    A class recording the changes made in a transaction, to undo them on an error, and
+    the events to deliver on commit.
+    """
+
+    def __init__(self, next_id: int):
+        self.next_id = next_id
+        self.undo = []
+        self.edited = {}
+        self.events = []
+
+    def log(self, action: str, item, detail=None) -> None:
+        """
+        A method that records a change of a record with what is needed to undo it:
+        the index key for "add", "delete" and "rekey", the former state for "fields".
+        """
+
+        self.undo.append((action, item, detail))
+
+
+class Book(UserDict, ABC):
+    """
+    A base class for storing records under stable integer ids.
+
+    Records are also indexed by a unique key (the name of a contact or the digest of
+    the text of a note), so renaming a record only moves its index entry. The
+    generation is bumped on every change, so data derived from the records can tell
+    whether it is stale; listeners subscribed to the book receive the changes as
+    events (see source.events), events are created only if someone listens.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.index = {}
+        self.next_id = 1
+        self.generation = 0
+        self.listeners = []
+        self.journal = None
+        self.derived = {}
+
+    @abstractmethod
+    def key_of(self, item) -> str:
+        """
+        A method that returns the unique key of a record, defined by every book.
+        """
+
+    def subscribe(self, listener, *types, summarized: bool = True) -> None:
+        """
+        A method that registers a function called with the events of the given types,
+        of all types if none are given. A listener of BookRestored gets only that
+        event for a transaction changing most of the book, unless summarized is
+        False, e.g. for a listener that needs every change.
+        """
+
+        self.listeners.append((listener, types, summarized))
+
+    def unsubscribe(self, listener) -> None:
+        """
+        A method that removes a registered function.
+        """
+
+        self.listeners = [entry for entry in self.listeners if entry[0] != listener]
+
+    def emit(self, event_type, **fields) -> None:
+        """
+        A method that records a change and sends it to the listeners, after the commit
+        in a transaction.
+        """
+
+        self.generation += 1
+        if self.listeners:
+            event = event_type(self, **fields)
+            if self.journal is None:
+                self.deliver(event)
+            else:
+                self.journal.events.append(event)
+
+    def deliver(self, event) -> None:
+        """
+        A method that calls the listeners of the type of the event.
+        """
+
+        for listener, types, _ in list(self.listeners):
+            if not types or isinstance(event, types):
+                listener(event)
+
+    def add(self, item) -> None:
+        """
+        A method that adds a record, keeping its id if it is not taken.
+        """
+
+        self.insert(item)
+        if self.journal is not None:
+            self.journal.log("add", item, self.key_of(item))
+        self.emit(RecordAdded, record=item)
+
+    def empty(self):
+        """
+        A method that returns an empty book of the same kind.
+        """
+
+        return type(self)()
+
+    def insert(self, item) -> None:
+        """
+        A method that adds a record without emitting an event.
         """
 
-        if str(record.name) in self.data.keys():
+        key = self.key_of(item)
+        if key in self.index:
             raise ValidationError()
-        self.data[str(record.name)] = record
+        uid = getattr(item, "uid", None)
+        if uid is None or uid in self.data:
+            uid = item.uid = self.next_id
+        self.next_id = max(self.next_id, uid + 1)
+        self.data[uid] = item
+        self.index[key] = uid
+        item._owner = self
+
+    def make_key(self, key: str):
+        """
+        A method that turns a key given by the user into the index key.
+        """
+
+        return key
+
+    def sort_key(self, item) -> str:
+        """
+        A method that returns the value the records are listed by.
+        """
+
+        return self.key_of(item)
+
+    def has(self, key: str) -> bool:
+        """
+        A method that checks whether a record with the key exists.
+        """
+
+        return self.make_key(key) in self.index
+
+    def find(self, key: str):
+        """
+        A method that finds a record by its key.
+        """
+
+        return self.data[self.index[self.make_key(key)]]
+
+    def get_by_id(self, uid: int):
+        """
+        A method that finds a record by its id.
+        """
+
+        return self.data[uid]
+
+    def delete(self, key: str) -> None:
+        """
+        A method that removes a record by its key.
+        """
+
+        self.delete_key(self.make_key(key))
+
+    def delete_key(self, key) -> None:
+        """
+        A method that removes a record by its index key.
+        """
 
-    def find(self, name: str) -> Record:
+        item = self.data.pop(self.index.pop(key))
+        item._owner = None
+        if self.journal is not None:
+            self.journal.log("delete", item, key)
+        self.emit(RecordRemoved, record=item)
+
+    def rekey(self, item, old_key: str) -> None:
         """
-        A method that finds a record in the address book.
+        A method that moves the index entry of a record whose key field was changed.
         """
 
-        return self.data[name]
+        self.move(item, self.make_key(old_key))
 
-    def delete(self, name: str) -> None:
+    def move(self, item, old_key) -> None:
         """
-        A method that removes a record from the address book.
+        A method that moves the index entry of a record from the old index key.
         """
 
-        self.data.pop(name)
+        key = self.key_of(item)
+        if self.index.get(key, item.uid) != item.uid:
+            raise ValidationError()
+        del self.index[old_key]
+        self.index[key] = item.uid
+        if self.journal is not None:
+            self.journal.log("rekey", item, old_key)
+        self.emit(RecordRenamed, record=item, old_key=old_key, key=key)
+
+    def reindex(self, item, stale_key) -> None:
+        """
+        A method that indexes a record by its current key, dropping the stale key if
+        it still points to the record.
+        """
 
+        if self.index.get(stale_key) == item.uid:
+            self.move(item, stale_key)
+        elif self.key_of(item) not in self.index:
+            self.index[self.key_of(item)] = item.uid
 
-class NoteBook(UserDict):
+    def remove(self, item) -> None:
+        """
+        A method that removes a record by its current key.
+        """
+
+        self.delete_key(self.key_of(item))
+
+    def touch(self, item) -> None:
+        """
+        A method that reports a record changed in place by setters that emit no event
+        of their own, with a RecordChanged event.
+        """
+
+        self.emit(RecordChanged, record=item)
+
+    def edit(self, key: str):
+        """
+        A method that finds a record to change in place in a transaction; the state
+        of the record is kept to undo the changes and a changed key is moved in the
+        index on commit.
+        """
+
+        item = self.find(key)
+        if self.journal is not None and item.uid not in self.journal.edited:
+            self.journal.edited[item.uid] = (item, self.key_of(item))
+            self.journal.log("fields", item, item.snapshot())
+        return item
+
+    @contextmanager
+    def transaction(self, save=None):
+        """
+        A method that groups changes of the book, applied together or not at all.
+
+        Records are added, deleted and edited (see edit()) in place as usual. On an
+        error, a ValidationError of a field or of a taken key on commit included, the
+        changes are undone and the error is raised again. The events are delivered
+        on commit; the listeners of BookRestored that allow it get only that event
+        if most of the book was changed. Then save is called. Nested transactions
+        are part of the outer.
+
+        :param save: function without arguments called after commit, e.g. to save
+        """
+
+        if self.journal is not None:
+            yield self
+            return
+        self.journal = journal = Journal(self.next_id)
+        try:
+            yield self
+            for item, old_key in journal.edited.values():
+                if self.data.get(item.uid) is item and self.key_of(item) != old_key:
+                    self.move(item, old_key)
+        except BaseException:
+            self.rollback(journal)
+            raise
+        finally:
+            self.journal = None
+
+        events = journal.events
+        changed = {id(getattr(event, "record", self)) for event in events}
+        if len(changed) > len(self.data) // 2:
+            restored = BookRestored(self)
+            for listener, types, summarized in list(self.listeners):
+                if summarized and (not types or issubclass(BookRestored, types)):
+                    listener(restored)
+                    continue
+                for event in events:
+                    if not types or isinstance(event, types):
+                        listener(event)
+        else:
+            for event in events:
+                self.deliver(event)
+        if save is not None:
+            save()
+
+    def rollback(self, journal: Journal) -> None:
+        """
+        A method that undoes the changes recorded in a journal, latest first.
+        """
+
+        for action, item, detail in reversed(journal.undo):
+            if action == "add":
+                del self.data[item.uid]
+                del self.index[detail]
+                item._owner = None
+            elif action == "delete":
+                self.data[item.uid] = item
+                self.index[detail] = item.uid
+                item._owner = self
+            elif action == "rekey":
+                del self.index[self.key_of(item)]
+                self.index[detail] = item.uid
+            elif action == "fields":
+                item.revert(detail)
+        self.next_id = journal.next_id
+        self.generation += 1
+
+    def ordered(self) -> dict:
+        """
+        A method that returns the records by key, sorted by key.
+        """
+
+        return {
+            key: self.data[uid]
+            for key, uid in sorted(
+                self.index.items(), key=lambda entry: self.sort_key(self.data[entry[1]])
+            )
+        }
+
+    def restore(self, items) -> None:
+        """
+        A method that replaces all records, for example with the loaded ones.
+        """
+
+        self.data = {}
+        self.index = {}
+        self.next_id = 1
+        for item in items:
+            self.insert(item)
+        self.emit(BookRestored)
+
+
+class AddressBook(Book):
+    """
+    A class for storing and managing records.
+    """
+
+    def key_of(self, item: Record) -> str:
+        """
+        A method that returns the name of the record.
+        """
+
+        return item.name.value
+
+    def add_record(self, record: Record) -> None:
+        """
+        A method that adds a record to the address book.
+        """
+
+        self.add(record)
+
+
+class NoteBook(Book):
     """
     A class for storing and managing notes with tags.
+
+    Notes added without a blob store read their texts from the store of the
+    notebook, e.g. the notes loaded from a file or merged from another process.
     """
 
-    def add_notice(self, notice: Notice) -> None:
+    def __init__(self, store=None):
+        super().__init__()
+        self.store = store
+
+    def empty(self) -> "NoteBook":
         """
-        A method that adds a notice to the note book.
+        A method that returns an empty notebook reading from the same store.
         """
 
-        if str(notice.note) in self.data.keys():
-            raise ValidationError()
-        self.data[str(notice.note)] = notice
+        return NoteBook(self.store)
+
+    def insert(self, item: Notice) -> None:
+        """
+        A method that adds a notice without emitting an event, giving its note the
+        store of the notebook.
+        """
 
-    def find(self, note: str) -> Notice:
+        super().insert(item)
+        if item.note.store is None:
+            item.note.store = self.store
+
+    def key_of(self, item: Notice) -> bytes:
+        """
+        A method that returns the digest of the text of the notice.
+        """
+
+        return item.note.digest
+
+    def make_key(self, key: str) -> bytes:
         """
-        A method that finds a notice in the note book.
+        A method that returns the digest of a text given by the user.
         """
 
-        return self.data[note]
+        return digest_of(key)
 
-    def delete(self, note: str) -> None:
+    def sort_key(self, item: Notice) -> str:
         """
-        A method that removes a record from the address book.
+        A method that returns the preview of the notice.
         """
 
-        self.data.pop(note)
+        return item.note.preview
+
+    def add_notice(self, notice: Notice) -> None:
+        """
+        A method that adds a notice to the note book.
+        """
+
+        self.add(notice)
+
+
+def record_from_dict(data: dict) -> Record:
+    """
+    A function that creates a record from a dictionary returned by Record.to_dict.
+    """
+
+    if not isinstance(data.get("name"), str):
+        raise ValidationError()
+    record = Record()
+    record.add_name(data["name"])
+    for phone in data.get("phones") or []:
+        record.add_phone(phone)
+    for field in ("email", "birthday", "address"):
+        if data.get(field) is not None:
+            getattr(record, f"add_{field}")(data[field])
+    return record
+
+
+def notice_from_dict(data: dict) -> Notice:
+    """
+    A function that creates a notice from a dictionary returned by Notice.to_dict.
+    """
+
+    notice = Notice()
+    if not data.get("note"):
+        raise ValidationError()
+    notice.add_note(data["note"])
+    for tag in data.get("tags") or []:
+        notice.add_tag(tag)
+    return notice
@@ -0,0 +1,517 @@
+"""Module providing one-shot subcommands for the command line interface"""
+
+import argparse
+
+from source.constants import INDENT, FIELD, SEPARATOR, Color
+
+SEARCH_FIELDS = ("name", "phone", "birthday", "email", "address")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Function to build the parser of the command line arguments.
+
+    :return: parser; without a subcommand the interactive menu is started
+    """
+    parser = argparse.ArgumentParser(
+        prog="qbot", description="Personal assistant for managing contacts and notes"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="profiles",
+        metavar="DIR",
+        help="dump a cProfile .prof file per command to DIR (default profiles)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=0,
+        metavar="N",
+        help="print top N cumulative functions after each command",
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+
+    find = subparsers.add_parser("find", help="find contacts and exit")
+    group = find.add_mutually_exclusive_group(required=True)
+    for field in SEARCH_FIELDS:
+        group.add_argument(f"--{field}", help=f"part of the contact {field}")
+    find.set_defaults(handler=find_command)
+
+    birthdays = subparsers.add_parser(
+        "birthdays", help="show upcoming birthdays and exit"
+    )
+    group = birthdays.add_mutually_exclusive_group()
+    group.add_argument(
+        "--days", type=int, default=7, help="number of days from today (default 7)"
+    )
+    group.add_argument(
+        "--month", action="store_true", help="birthdays in the current month"
+    )
+    group.add_argument("--ages", action="store_true", help="age statistics")
+    group.add_argument("--next", type=int, metavar="K", help="next K birthdays")
+    birthdays.set_defaults(handler=birthdays_command)
+
+    add_contact = subparsers.add_parser("add-contact", help="add a contact and exit")
+    add_contact.add_argument("--name", required=True, help="3-20 characters")
+    add_contact.add_argument(
+        "--phone", action="append", default=[], help="+380991234567, can be repeated"
+    )
+    add_contact.add_argument("--email", help="example@mail.com")
+    add_contact.add_argument("--birthday", help="DD.MM.YYYY")
+    add_contact.add_argument("--address", help="3-40 characters")
+    add_contact.set_defaults(handler=add_contact_command)
+
+    serve = subparsers.add_parser("serve", help="serve the books as a local JSON API")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.set_defaults(handler=serve_command)
+
+    daemon = subparsers.add_parser(
+        "daemon", help="keep the books loaded and serve other qbot calls"
+    )
+    daemon.add_argument("--stop", action="store_true", help="stop a running daemon")
+    daemon.set_defaults(handler=daemon_command)
+
+    save_search = subparsers.add_parser(
+        "save-search", help="save a search of contacts or notes under a name"
+    )
+    save_search.add_argument("search", metavar="NAME", help="name of the saved search")
+    group = save_search.add_mutually_exclusive_group(required=True)
+    for field in SEARCH_FIELDS:
+        group.add_argument(f"--{field}", help=f"part of the contact {field}")
+    group.add_argument("--tag", help="part of a note tag")
+    group.add_argument("--note", help="part of the note text")
+    save_search.set_defaults(handler=save_search_command)
+
+    saved = subparsers.add_parser(
+        "saved", help="open a saved search or list the saved searches"
+    )
+    saved.add_argument(
+        "search", metavar="NAME", nargs="?", help="name of the saved search"
+    )
+    saved.add_argument("--delete", action="store_true", help="delete the search")
+    saved.set_defaults(handler=saved_command)
+
+    revisions = subparsers.add_parser(
+        "revisions", help="show the revisions of a note or restore one"
+    )
+    revisions.add_argument("note", help="part of the note text")
+    group = revisions.add_mutually_exclusive_group()
+    group.add_argument("--show", type=int, metavar="N", help="show revision N")
+    group.add_argument("--restore", type=int, metavar="N", help="restore revision N")
+    revisions.set_defaults(handler=revisions_command)
+
+    sync = subparsers.add_parser(
+        "sync", help="compare two copies of a storage file and merge their changes"
+    )
+    sync.add_argument("a", help="storage file, e.g. source/backup.dat")
+    sync.add_argument("b", help="another copy of the storage file")
+    sync.add_argument("--base", help="copy both were made from, for a three-way merge")
+    sync.add_argument(
+        "--dry-run", action="store_true", help="show the differences only"
+    )
+    sync.set_defaults(handler=sync_command)
+
+    dedup = subparsers.add_parser(
+        "dedup", help="find duplicate contacts and merge them"
+    )
+    dedup.add_argument(
+        "--threshold",
+        type=float,
+        metavar="T",
+        help="minimal score of duplicates from 0 to 1 (default 0.8)",
+    )
+    dedup.add_argument(
+        "--merge",
+        type=int,
+        nargs="?",
+        const=0,
+        metavar="N",
+        help="merge cluster N, or ask for every cluster if N is not given",
+    )
+    dedup.set_defaults(handler=dedup_command)
+
+    tags = subparsers.add_parser(
+        "tags", help="show the most used tags or the tags used with one"
+    )
+    tags.add_argument("tag", nargs="?", help="show the tags used with this tag")
+    tags.add_argument(
+        "--top", type=int, default=10, metavar="N", help="number of tags (default 10)"
+    )
+    tags.set_defaults(handler=tags_command)
+
+    return parser
+
+
+def run(args: argparse.Namespace, books=None) -> int:
+    """
+    Function to run a parsed one-shot subcommand.
+
+    :param args: parsed command line arguments
+    :param books: resident books of the daemon, loaded from the files by default
+    :return: exit status
+    """
+    if books is None:
+        from source.storage import Books
+
+        books = Books()
+    return args.handler(args, books)
+
+
+def find_command(args: argparse.Namespace, books) -> int:
+    """
+    Subcommand to find contacts by one of the fields.
+
+    :param args: parsed command line arguments
+    :param books: contact book and notebook
+    :return: exit status
+    """
+    from source.search_contacts import filter_contacts, show_result
+
+    field = next(field for field in SEARCH_FIELDS if getattr(args, field) is not None)
+    show_result(filter_contacts(books.book, field, getattr(args, field)))
+    print(SEPARATOR)
+    return 0
+
+
+def birthdays_command(args: argparse.Namespace, books) -> int:
+    """
+    Subcommand to show contacts with upcoming birthdays.
+
+    :param args: parsed command line arguments
+    :param books: contact book and notebook
+    :return: exit status
+    """
+    from source.birthdays import show_ages, show_month, show_upcoming
+
+    if args.month:
+        show_month(books.book)
+    elif args.ages:
+        show_ages(books.book)
+    elif args.next is not None:
+        from source.reminders import scheduler_of, show_next
+
+        show_next(scheduler_of(books.book), args.next)
+    elif args.days < 0:
+        return error("The number of days must not be negative")
+    else:
+        show_upcoming(books.book, args.days)
+    print(SEPARATOR)
+    return 0
+
+
+def add_contact_command(args: argparse.Namespace, books) -> int:
+    """
+    Subcommand to add a new contact to the contact book.
+
+    :param args: parsed command line arguments
+    :param books: contact book and notebook
+    :return: exit status
+    """
+    from source.classes import Record, ValidationError
+
+    record = Record()
+    steps = [
+        (record.add_name, args.name, "The name must contain 3-20 characters"),
+        (record.add_address, args.address, "The address must contain 3-40 characters"),
+        (record.add_email, args.email, "The email must be in example@mail.com format"),
+        (
+            record.add_birthday,
+            args.birthday,
+            "The birthday must be in DD.MM.YYYY format, not in future or more than 100 years ago",
+        ),
+    ]
+    steps += [
+        (record.add_phone, phone, "The phone number must be in +380991234567 format")
+        for phone in args.phone
+    ]
+    for setter, value, message in steps:
+        if value is None:
+            continue
+        try:
+            setter(value)
+        except ValidationError:
+            return error(message)
+
+    book = books.book
+    if book.has(record.name.value):
+        return error(f"Record with name {record.name.value} already exists")
+    with book.transaction(save=books.save_book):
+        book.add_record(record)
+    print(SEPARATOR)
+    print(
+        Color.GREEN
+        + f"{INDENT}{'New record added to address book':<{FIELD}}|"
+        + Color.RESET
+    )
+    print(SEPARATOR)
+    return 0
+
+
+def serve_command(args: argparse.Namespace, books) -> int:
+    """
+    Subcommand to serve the books over HTTP on localhost until interrupted.
+
+    :param args: parsed command line arguments
+    :param books: contact book and notebook
+    :return: exit status
+    """
+    from source.server import serve
+
+    serve(args.host, args.port)
+    return 0
+
+
+def daemon_command(args: argparse.Namespace, books) -> int:
+    """
+    Subcommand to run the daemon in foreground or to stop it.
+
+    :param args: parsed command line arguments
+    :param books: contact book and notebook
+    :return: exit status
+    """
+    from source.daemon import SOCKET, run_daemon, stop
+
+    if args.stop:
+        return 0 if stop() else error("Daemon is not running")
+    try:
+        run_daemon()
+    except RuntimeError:
+        return error(f"Daemon is already running on {SOCKET}")
+    except FileExistsError as exc:  # QBOT_SHARE while another process exports
+        return error(str(exc))
+    return 0
+
+
+def save_search_command(args: argparse.Namespace, books) -> int:
+    """
+    Subcommand to save a search of contacts or notes under a name.
+
+    :param args: parsed command line arguments
+    :param books: contact book and notebook
+    :return: exit status
+    """
+    from source.searches import FIELDS, SavedSearches
+
+    kind, field = next(
+        (kind, field)
+        for kind, fields in FIELDS.items()
+        for field in fields
+        if getattr(args, field) is not None
+    )
+    searches = SavedSearches(books.book, books.notebook)
+    search = searches.add(args.search, kind, field, getattr(args, field))
+    searches.save()
+    print(SEPARATOR)
+    message = f"Saved {args.search}: {search}, {len(search.ids)} found"
+    print(Color.GREEN + f"{INDENT}{message:<{FIELD}}|" + Color.RESET)
+    print(SEPARATOR)
+    return 0
+
+
+def saved_command(args: argparse.Namespace, books) -> int:
+    """
+    Subcommand to open or delete a saved search, or to list the saved searches.
+
+    :param args: parsed command line arguments
+    :param books: contact book and notebook
+    :return: exit status
+    """
+    from source.searches import SavedSearches, show_search, show_searches
+
+    searches = SavedSearches(books.book, books.notebook)
+    if args.search is not None and args.search not in searches.searches:
+        return error(f"No saved search {args.search}")
+    if args.search is None:
+        show_searches(searches)
+    elif args.delete:
+        searches.remove(args.search)
+        print(SEPARATOR)
+        print(Color.GREEN + f"{INDENT}{'Saved search deleted':<{FIELD}}|" + Color.RESET)
+    else:
+        show_search(searches, args.search)
+    searches.save()
+    print(SEPARATOR)
+    return 0
+
+
+def revisions_command(args: argparse.Namespace, books) -> int:
+    """
+    Subcommand to list the revisions of a note, to show one or to restore it.
+
+    :param args: parsed command line arguments
+    :param books: contact book and notebook
+    :return: exit status
+    """
+    from source.classes import ValidationError
+    from source.revisions import RevisionLog, show_revision, show_revisions
+    from source.search_notes import filter_notes
+
+    notebook = books.notebook
+    found = filter_notes(notebook, "note", args.note)
+    if not found:
+        return error(f"No note contains {args.note}")
+    if len(found) > 1:
+        return error(f"{len(found)} notes contain {args.note}, be more specific")
+    notice = found[0]
+    log = RevisionLog()
+    number = args.show if args.show is not None else args.restore
+    if number is None:
+        show_revisions(log.revisions(notice.serial))
+        print(SEPARATOR)
+        return 0
+    text = log.text(notice.serial, number)
+    if text is None:
+        return error(f"Revision {number} is not kept")
+    if args.show is not None:
+        show_revision(number, text)
+        print(SEPARATOR)
+        return 0
+    log.watch(notebook)
+    try:
+        with notebook.transaction(save=books.save_notebook):
+            notebook.edit(notice.note.value).add_note(text)
+    except ValidationError:
+        return error("Another note has the text of this revision")
+    print(SEPARATOR)
+    message = f"Revision {number} restored"
+    print(Color.GREEN + f"{INDENT}{message:<{FIELD}}|" + Color.RESET)
+    print(SEPARATOR)
+    return 0
+
+
+def sync_command(args: argparse.Namespace, books) -> int:
+    """
+    Subcommand to show the differences of two copies of a book and copy the changes
+    without conflicts between them.
+
+    :param args: parsed command line arguments
+    :param books: contact book and notebook, not used
+    :return: exit status
+    """
+    from source.storage import StaleSnapshotError
+    from source.sync import Copy, compare, same_kind, show_changes, sync
+
+    ours, theirs = Copy(args.a), Copy(args.b)
+    base = None if args.base is None else Copy(args.base)
+    if not same_kind(ours, theirs):
+        return error("The files hold different books")
+    changes = compare(ours, theirs, base)
+    show_changes(ours, theirs, changes)
+    conflicts = sum(direction == "!" for _, direction, _ in changes)
+    if args.dry_run or len(changes) == conflicts:
+        print(SEPARATOR)
+        return 0
+    try:
+        sync(ours, theirs, changes)
+    except StaleSnapshotError:
+        return error("A file was changed during the sync, run it again")
+    except FileNotFoundError as exc:
+        return error(f"Missing {exc.filename}")
+    print(SEPARATOR)
+    message = f"Copied {len(changes) - conflicts} changes, {conflicts} conflicts left"
+    print(Color.GREEN + f"{INDENT}{message:<{FIELD}}|" + Color.RESET)
+    print(SEPARATOR)
+    return 0
+
+
+def dedup_command(args: argparse.Namespace, books) -> int:
+    """
+    Subcommand to show the clusters of duplicate contacts and to merge them.
+
+    :param args: parsed command line arguments
+    :param books: contact book and notebook
+    :return: exit status
+    """
+    from source.dedup import THRESHOLD, find_duplicates, merge, show_clusters
+
+    book = books.book
+    threshold = THRESHOLD if args.threshold is None else args.threshold
+    clusters = find_duplicates(book, threshold)
+    show_clusters(clusters)
+    if args.merge is None or not clusters:
+        print(SEPARATOR)
+        return 0
+    if args.merge:
+        if not 0 < args.merge <= len(clusters):
+            return error(f"There is no cluster {args.merge}")
+        chosen = [clusters[args.merge - 1]]
+        if not chosen[0].complete:
+            return error(f"Not all contacts of cluster {args.merge} are alike")
+    else:
+        chosen = [
+            cluster
+            for number, cluster in enumerate(clusters)
+            if cluster.complete and confirm(f"Merge cluster {number + 1}? Y/N [N]: ")
+        ]
+    if not chosen:
+        print(SEPARATOR)
+        print(f"{INDENT}{'No clusters merged':<{FIELD}}|")
+        print(SEPARATOR)
+        return 0
+    with book.transaction(save=books.save_book):
+        results = [merge(book, cluster.records) for cluster in chosen]
+    print(SEPARATOR)
+    merged = sum(len(cluster.records) for cluster in chosen)
+    message = f"Merged {merged} contacts into {len(chosen)}"
+    print(Color.GREEN + f"{INDENT}{message:<{FIELD}}|" + Color.RESET)
+    for kept, dropped in results:
+        if dropped:
+            phones = ", ".join(phone.value for phone in dropped)
+            message = f"Phones not kept for {kept.name.value}: {phones}"
+            print(Color.YELLOW + f"{INDENT}{message:<{FIELD}}|" + Color.RESET)
+    print(SEPARATOR)
+    return 0
+
+
+def tags_command(args: argparse.Namespace, books) -> int:
+    """
+    Subcommand to show the most used tags or the tags used together with a tag.
+
+    :param args: parsed command line arguments
+    :param books: contact book and notebook
+    :return: exit status
+    """
+    from source.storage import STORAGE, file_stamp
+    from source.tags import TagStats, show_related, show_tags
+
+    stats = TagStats.load(file_stamp(STORAGE))
+    if stats is None:
+        stats = TagStats()
+        stats.reload(books.notebook)
+        stats.save(books.notebook.snapshot[0])
+    if args.tag is None:
+        show_tags(stats, args.top)
+    elif not show_related(stats, args.tag, args.top):
+        return error(f"No note has the tag {args.tag}")
+    print(SEPARATOR)
+    return 0
+
+
+def error(message: str) -> int:
+    """
+    Function to report a failed subcommand.
+
+    :param message: an error message
+    :return: exit status
+    """
+    print(SEPARATOR)
+    print(Color.RED + f"{INDENT}{message:<{FIELD}}|" + Color.RESET)
+    print(SEPARATOR)
+    return 1
+
+
+def confirm(question: str) -> bool:
+    """
+    Function to ask a yes or no question, no if there is no answer.
+
+    :param question: question with the possible answers
+    :return: True if the answer is yes
+    """
+    print(SEPARATOR)
+    try:
+        answer = input(Color.BLUE + f"{INDENT}{question}" + Color.RESET)
+    except EOFError:
+        return False
+    return answer.lower().strip() in ("y", "yes")
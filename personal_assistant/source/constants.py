@@ -1,5 +1,7 @@
 """Module providing the constants"""
 
+import os
+
 
 class Color:
     """
@@ -25,7 +27,26 @@ COLUMN_6 = 40
 SPAN = COLUMN_1 + COLUMN_2 + COLUMN_3 + COLUMN_4 + COLUMN_5 + COLUMN_6 + 5
 FIELD = SPAN - COLUMN_1 - 1
 INDENT = f"|{' ' * COLUMN_1}|"
+PREVIEW = COLUMN_4 + COLUMN_5 + COLUMN_6 + 2
 HEADER = f"|{'#':^{COLUMN_1}}|{'FULLNAME':^{COLUMN_2}}|{'EMAIL':^{COLUMN_3}}|{'PHONES':^{COLUMN_4}}|{'BIRTHDAY':^{COLUMN_5}}|{'ADDRESS':^{COLUMN_6}}|"
-NOTE_HEADER = f"|{'#':^{COLUMN_1}}|{'TAGS':^{COLUMN_2 + COLUMN_3 + 1}}|{'NOTE':^{COLUMN_4 + COLUMN_5 + COLUMN_6 + 2}}|"
+NOTE_HEADER = (
+    f"|{'#':^{COLUMN_1}}|{'TAGS':^{COLUMN_2 + COLUMN_3 + 1}}|{'NOTE':^{PREVIEW}}|"
+)
 SKIPPER = Color.YELLOW + f"{INDENT}{'Operation skipped':<{FIELD}}|" + Color.RESET
 SEPARATOR = "-" * (SPAN + 2)
+
+
+def setting(name: str, default):
+    """
+    Function to read a number overriding a constant from the environment.
+
+    :param name: name of the environment variable
+    :param default: value used when the variable is unset, malformed or negative;
+        its type is the type of the setting
+    :return: the setting
+    """
+    try:
+        value = type(default)(os.environ.get(name, default))
+    except ValueError:
+        return default
+    return value if value >= 0 else default
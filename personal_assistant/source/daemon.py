@@ -0,0 +1,163 @@
+"""Module providing a warm daemon keeping the books resident behind a Unix socket"""
+
+import json
+import os
+import socket
+
+SOCKET = os.environ.get("QBOT_SOCKET", "source/qbot.sock")
+FORWARDED = ("find", "birthdays", "add-contact")
+
+
+def forward(argv: list[str], path: str = SOCKET) -> int | None:
+    """
+    Function to run a subcommand in the daemon and print its output.
+
+    :param argv: command line arguments
+    :param path: path of the daemon socket
+    :return: exit status, or None if the daemon is not running or can't run the command
+    """
+    if not argv or argv[0] not in FORWARDED:
+        return None
+    try:
+        response = request({"argv": argv}, path)
+    except (OSError, ValueError):  # also no or a broken answer of the daemon
+        return None
+    if "error" in response:
+        return None
+    print(response["output"], end="")
+    return response["status"]
+
+
+def request(message: dict, path: str = SOCKET) -> dict:
+    """
+    Function to send one JSON message to the daemon and wait for the answer.
+
+    :param message: JSON serializable message
+    :param path: path of the daemon socket
+    :return: answer of the daemon
+    :raise ValueError: if the answer is not a JSON object
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(path)
+        client.sendall(json.dumps(message).encode() + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        chunks = []
+        while chunk := client.recv(65536):
+            chunks.append(chunk)
+    response = json.loads(b"".join(chunks))
+    if not isinstance(response, dict):
+        raise ValueError(response)
+    return response
+
+
+def alive(path: str = SOCKET) -> bool:
+    """
+    Function to check whether a daemon is listening on the socket.
+
+    :param path: path of the daemon socket
+    :return: True if a daemon is running
+    """
+    try:
+        request({"ping": True}, path)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def stop(path: str = SOCKET) -> bool:
+    """
+    Function to ask a running daemon to exit.
+
+    :param path: path of the daemon socket
+    :return: True if a daemon was running
+    """
+    try:
+        request({"stop": True}, path)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def run_daemon(path: str = SOCKET) -> None:
+    """
+    Function to load the books once and serve subcommands until stopped.
+
+    :param path: path of the daemon socket
+    """
+    import asyncio
+    import io
+    from contextlib import redirect_stderr, redirect_stdout
+
+    from source.cli import build_parser, run
+    from source.storage import Books, loader
+
+    books = Books(*loader())
+    parser = build_parser()
+    export = None
+    if os.environ.get("QBOT_SHARE"):
+        from source.shared import SharedExport
+
+        export = SharedExport()
+        export.refresh(books.book, books.notebook)
+
+    def execute(argv: list[str]) -> dict:
+        books.refresh()
+        output = io.StringIO()
+        with redirect_stdout(output), redirect_stderr(output):
+            try:
+                status = run(parser.parse_args(argv), books)
+            except SystemExit as exc:
+                status = exc.code if isinstance(exc.code, int) else 1
+        if export is not None:
+            export.refresh(books.book, books.notebook)
+        return {"status": status, "output": output.getvalue()}
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            try:
+                message = json.loads(await reader.readline())
+                argv = message.get("argv") or [None]
+                if message.get("stop"):
+                    response = {"status": 0, "output": ""}
+                    server.close()
+                elif message.get("ping"):
+                    response = {"status": 0, "output": ""}
+                elif argv[0] in FORWARDED:
+                    response = execute(argv)
+                else:
+                    response = {
+                        "status": 2,
+                        "output": "Command is not served by daemon\n",
+                    }
+            except Exception as exc:  # the client runs the command in-process
+                response = {"status": 1, "error": repr(exc)}
+            writer.write(json.dumps(response).encode())
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def main():
+        nonlocal server
+        server = await asyncio.start_unix_server(handle, path)
+        async with server:
+            try:
+                await server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    if os.path.exists(path):
+        if alive(path):
+            raise RuntimeError(f"Daemon is already running on {path}")
+        os.unlink(path)
+    server = None
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if export is not None:
+            export.close()
+        if os.path.exists(path):
+            os.unlink(path)
@@ -0,0 +1,275 @@
+"""Module providing the detection and the merge of duplicate contacts"""
+
+import re
+from collections import defaultdict
+from datetime import date
+from difflib import SequenceMatcher
+from typing import NamedTuple
+
+from source.constants import COLUMN_1, FIELD, INDENT, SEPARATOR, setting
+
+THRESHOLD = setting("QBOT_DEDUP_THRESHOLD", 0.8)
+# names less alike are other people whatever else the contacts share, e.g. relatives
+# with the same landline
+MIN_NAME = 0.85
+# blocks of more contacts share too common a key to tell anything, they are skipped
+MAX_BLOCK = 100
+WEIGHTS = {"name": 0.4, "phone": 0.25, "email": 0.2, "birthday": 0.15}
+PHONE_SUFFIX = 10**7
+# the contact menu shows and edits at most two phones
+MAX_PHONES = 2
+PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+class Profile(NamedTuple):
+    """
+    A class for the normalized fields of a contact compared by the dedup.
+    """
+
+    record: object
+    name: str
+    phones: set
+    email: str | None
+    birthday: date | None
+
+
+def words_of(name: str) -> list:
+    """
+    Function to split a name into lower case words without punctuation.
+    """
+    return PUNCTUATION.sub("", name.casefold()).split()
+
+
+def blocking_keys(record) -> list:
+    """
+    Function to get the keys of the blocks a contact is compared in.
+
+    The keys are the beginnings of the name words in any order, the last digits of
+    every phone, the email local part without dots and "+" tags, and the birthday
+    with the initials; they are of different types so kinds of keys never collide.
+
+    :param record: contact
+    :return: blocking keys
+    """
+    words = words_of(record.name.value)
+    words.sort()
+    keys = ["n" + " ".join([word[:3] for word in words])]
+    for phone in record.phones:
+        keys.append(phone.digits % PHONE_SUFFIX)
+    if record.email is not None:
+        local = record.email.value.casefold().partition("@")[0]
+        keys.append("e" + local.partition("+")[0].replace(".", ""))
+    if record.birthday is not None:
+        keys.append((record.birthday.value, "".join([word[:1] for word in words])))
+    return keys
+
+
+def profile_of(record) -> Profile:
+    """
+    Function to normalize the fields of a contact for score().
+    """
+    email = None
+    if record.email is not None:
+        local, _, domain = record.email.value.casefold().partition("@")
+        email = local.partition("+")[0].replace(".", "") + "@" + domain
+    return Profile(
+        record,
+        " ".join(sorted(words_of(record.name.value))),
+        {phone.digits for phone in record.phones},
+        email,
+        None if record.birthday is None else record.birthday.value,
+    )
+
+
+def score(first: Profile, second: Profile, threshold: float = 0.0) -> float:
+    """
+    Function to score how likely two contacts are the same person.
+
+    Every field known for both contacts adds its weighted similarity; the phones,
+    the email and the birthday are compared first, the names only if the score can
+    still reach the threshold. The names must be at least MIN_NAME alike, contacts
+    with nothing but the name to compare must have the same name.
+
+    :return: weighted similarity from 0 to 1, 0 if it is below the threshold
+    """
+    total = WEIGHTS["name"]
+    points = 0.0
+    if first.phones and second.phones:
+        total += WEIGHTS["phone"]
+        points += WEIGHTS["phone"] * (not first.phones.isdisjoint(second.phones))
+    if first.email is not None and second.email is not None:
+        total += WEIGHTS["email"]
+        points += WEIGHTS["email"] * (first.email == second.email)
+    if first.birthday is not None and second.birthday is not None:
+        total += WEIGHTS["birthday"]
+        points += WEIGHTS["birthday"] * (first.birthday == second.birthday)
+    if total == WEIGHTS["name"] and first.name != second.name:
+        return 0.0  # a similar name alone is as likely another person
+    needed = max(MIN_NAME, (threshold * total - points) / WEIGHTS["name"])
+    if needed > 1:
+        return 0.0
+    matcher = SequenceMatcher(None, first.name, second.name, autojunk=False)
+    if matcher.real_quick_ratio() < needed or matcher.quick_ratio() < needed:
+        return 0.0
+    similarity = (points + WEIGHTS["name"] * matcher.ratio()) / total
+    return similarity if similarity >= threshold else 0.0
+
+
+class Cluster:
+    """
+    A class for contacts found to be the same person, scored by the weakest of their
+    pairs; a cluster is complete if every pair reaches the threshold, not only the
+    pairs that joined it.
+    """
+
+    def __init__(self, records: list, score: float, complete: bool):
+        self.records = records
+        self.score = score
+        self.complete = complete
+
+
+def find_duplicates(book, threshold: float = THRESHOLD) -> list:
+    """
+    Function to find the clusters of duplicate contacts.
+
+    Contacts are grouped by blocking keys and only the contacts of a block are
+    compared, so the cost grows with the number of contacts and not of their pairs.
+    A block gets a list only once a second contact has its key and the fields are
+    normalized only for contacts sharing a block. Pairs scoring at least the
+    threshold are joined into clusters, then all pairs of every cluster are scored,
+    so a chain of similar contacts is not taken for one person.
+
+    :param book: AddressBook
+    :param threshold: minimal score of a duplicate pair
+    :return: clusters, the most certain first
+    """
+    records = list(book.data.values())
+    first_of = {}
+    blocks = defaultdict(list)
+    for number, record in enumerate(records):
+        for key in blocking_keys(record):
+            first = first_of.setdefault(key, number)
+            if first != number:
+                members = blocks[key]
+                if not members:
+                    members.append(first)
+                members.append(number)
+    del first_of
+
+    profiles = {}
+    parents = {}
+
+    def profile(number: int) -> Profile:
+        if number not in profiles:
+            profiles[number] = profile_of(records[number])
+        return profiles[number]
+
+    def root(number: int) -> int:
+        while number in parents:
+            number = parents[number]
+        return number
+
+    scored = {}
+    weakest = {}
+    for members in blocks.values():
+        if len(members) > MAX_BLOCK:
+            continue
+        for position, first in enumerate(members):
+            for second in members[position + 1 :]:
+                if (first, second) in scored:
+                    continue
+                similarity = score(profile(first), profile(second), threshold)
+                scored[first, second] = similarity
+                if not similarity:
+                    continue
+                first_root, second_root = root(first), root(second)
+                if first_root != second_root:
+                    parents[second_root] = first_root
+                weakest[first_root] = min(
+                    similarity,
+                    weakest.pop(first_root, 1.0),
+                    weakest.pop(second_root, 1.0),
+                )
+
+    clusters = {number: [number] for number in weakest}
+    for number in sorted(parents):
+        clusters[root(number)].append(number)
+    found = []
+    for number, members in clusters.items():
+        if len(members) > 2:
+            if len(members) > MAX_BLOCK:
+                weakest[number] = 0.0
+            members.sort()
+            for position, first in enumerate(members):
+                for second in members[position + 1 :]:
+                    if not weakest[number]:
+                        break
+                    similarity = scored.get((first, second))
+                    if similarity is None:
+                        similarity = score(profile(first), profile(second), threshold)
+                    weakest[number] = min(weakest[number], similarity)
+        found.append(
+            Cluster(
+                [records[member] for member in members],
+                weakest[number],
+                weakest[number] >= threshold,
+            )
+        )
+    return sorted(found, key=lambda cluster: -cluster.score)
+
+
+def merge(book, records: list):
+    """
+    Function to merge duplicate contacts into the one with the most fields: its
+    missing fields are taken from the others, the phones of the others are added up
+    to MAX_PHONES, the other contacts are removed. Changes are made in a transaction.
+
+    :param book: AddressBook
+    :param records: duplicate contacts
+    :return: kept contact and the phones that didn't fit into it
+    """
+
+    def filled(record) -> tuple:
+        fields = (record.email, record.birthday, record.address)
+        return (
+            sum(field is not None for field in fields) + len(record.phones),
+            -record.uid,
+        )
+
+    dropped = []
+    with book.transaction():
+        kept = book.edit(book.key_of(max(records, key=filled)))
+        for record in records:
+            if record is kept:
+                continue
+            for field in ("email", "birthday", "address"):
+                if getattr(kept, field) is None and getattr(record, field) is not None:
+                    kept.set_field(field, getattr(record, field))
+            for phone in record.phones:
+                if phone in kept.phones or phone in dropped:
+                    continue
+                if len(kept.phones) < MAX_PHONES:
+                    kept.insert_phone(len(kept.phones), phone)
+                else:
+                    dropped.append(phone)
+            book.remove(record)
+    return kept, dropped
+
+
+def show_clusters(clusters: list) -> None:
+    """
+    Function to display the clusters of duplicate contacts with their scores.
+
+    :param clusters: list returned by find_duplicates
+    """
+    print(SEPARATOR)
+    if not clusters:
+        print(f"{INDENT}{'No duplicate contacts found':<{FIELD}}|")
+        return
+    for number, cluster in enumerate(clusters):
+        names = " / ".join(record.name.value for record in cluster.records)
+        score = f"{cluster.score:.2f}" if cluster.complete else "mixed"
+        line = f"{score}  {names}"
+        if len(line) > FIELD:
+            line = line[: FIELD - 3] + "..."
+        print(f"|{number + 1:^{COLUMN_1}}|{line:<{FIELD}}|")
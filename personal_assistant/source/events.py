@@ -0,0 +1,135 @@
+"""Module providing the events emitted by the books when their records change"""
+
+
+class Event:
+    """
+    A base class for the changes of a book, the fields are given as keywords.
+    """
+
+    __slots__ = ("book",)
+
+    def __init__(self, book, **fields):
+        self.book = book
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for cls in type(self).__mro__
+            for name in getattr(cls, "__slots__", ())
+            if name != "book"
+        )
+        return f"{type(self).__name__}({fields})"
+
+
+class BookRestored(Event):
+    """
+    All records of the book were replaced, for example on loading or merging.
+    """
+
+    __slots__ = ()
+
+
+class BookSaved(Event):
+    """
+    The book was written to its file, so its changes since the last save are kept.
+    """
+
+    __slots__ = ()
+
+
+class RecordEvent(Event):
+    """
+    A base class for the changes of one record or notice.
+    """
+
+    __slots__ = ("record",)
+
+
+class RecordAdded(RecordEvent):
+    """
+    A record was added to the book.
+    """
+
+    __slots__ = ()
+
+
+class RecordRemoved(RecordEvent):
+    """
+    A record was removed from the book.
+    """
+
+    __slots__ = ()
+
+
+class RecordRenamed(RecordEvent):
+    """
+    The key of a record was changed from the old_key to the key in the index.
+    """
+
+    __slots__ = ("old_key", "key")
+
+
+class RecordChanged(RecordEvent):
+    """
+    A record was changed in a way not described by the other events.
+    """
+
+    __slots__ = ()
+
+
+class FieldSet(RecordEvent):
+    """
+    An attribute of a record was set, e.g. "name", "birthday" or "phones".
+    """
+
+    __slots__ = ("field", "old", "new")
+
+
+class PhoneAdded(RecordEvent):
+    """
+    A phone was added to a record.
+    """
+
+    __slots__ = ("phone", "index")
+
+
+class PhoneRemoved(RecordEvent):
+    """
+    A phone was removed from a record.
+    """
+
+    __slots__ = ("phone", "index")
+
+
+class PhoneChanged(RecordEvent):
+    """
+    A phone of a record was replaced.
+    """
+
+    __slots__ = ("old", "new", "index")
+
+
+class TagAdded(RecordEvent):
+    """
+    A tag was added to a notice.
+    """
+
+    __slots__ = ("tag", "index")
+
+
+class TagRemoved(RecordEvent):
+    """
+    A tag was removed from a notice.
+    """
+
+    __slots__ = ("tag", "index")
+
+
+class TagChanged(RecordEvent):
+    """
+    A tag of a notice was replaced.
+    """
+
+    __slots__ = ("old", "new", "index")
@@ -1,10 +1,17 @@
 """Module providing a functionality to manage the contacts in a contact list"""
 
-from copy import deepcopy
-from typing import Tuple
-
-from source.birthdays import search_upcoming_birthday_contacts
-from source.classes import Record, AddressBook, ValidationError, NoteBook, Notice
+from functools import wraps
+from importlib import import_module
+from textwrap import wrap
+
+from source.classes import (
+    Record,
+    AddressBook,
+    ValidationError,
+    NoteBook,
+    Notice,
+    EditSession,
+)
 from source.constants import (
     COLUMN_1,
     SEPARATOR,
@@ -15,8 +22,7 @@ from source.constants import (
     NOTE_HEADER,
     Color,
 )
-from source.search_contacts import search_contacts_by_field
-from source.search_notes import search_notes_by_field
+from source.instrumentation import instrument
 
 
 def input_error(message: str):
@@ -35,6 +41,7 @@ def input_error(message: str):
         :return: function if no input error occurred, or a description of the error
         """
 
+        @wraps(func)
         def inner(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
@@ -66,19 +73,38 @@ def get_command(command: str):
         "1": show_all,
         "2": contact_adder,
         "3": contact_manager,
-        "4": search_contacts_by_field,
-        "5": search_upcoming_birthday_contacts,
+        "4": "source.search_contacts:search_contacts_by_field",
+        "5": "source.birthdays:search_upcoming_birthday_contacts",
         "6": show_all,
         "7": note_adder,
         "8": note_manager,
-        "9": search_notes_by_field,
+        "9": "source.search_notes:search_notes_by_field",
         "help": helper,
+        "stats": "source.instrumentation:show_stats",
+        "memory": "source.memory:memory_report",
+        "undo": "source.history:undo_command",
+        "redo": "source.history:redo_command",
+        "saved": "source.searches:saved_command",
+        "tags": "source.tags:tags_command",
     }
 
     cmd = commands.get(command)
     if not cmd:
-        return invalid_command
-    return cmd
+        return instrument(invalid_command)
+    return instrument(resolve(cmd))
+
+
+def resolve(handler):
+    """
+    A function to import a handler given as "module:function" on its first use.
+
+    :param handler: function or its "module:function" path
+    :return: function
+    """
+    if isinstance(handler, str):
+        module, _, name = handler.partition(":")
+        handler = getattr(import_module(module), name)
+    return handler
 
 
 def get_manager(command: str):
@@ -102,8 +128,8 @@ def get_manager(command: str):
 
     cmd = commands.get(command)
     if not cmd:
-        return invalid_command
-    return cmd
+        return instrument(invalid_command)
+    return instrument(cmd)
 
 
 def contact_adder(book: AddressBook, *_) -> None:
@@ -121,7 +147,7 @@ def contact_adder(book: AddressBook, *_) -> None:
             print(SEPARATOR)
             print(SKIPPER)
             break
-        if record.name.value in book.data.keys():
+        if book.has(record.name.value):
             print(SEPARATOR)
             print(
                 Color.YELLOW
@@ -183,7 +209,7 @@ def note_adder(notebook: NoteBook, *_) -> None:
             print(SEPARATOR)
             print(SKIPPER)
             break
-        if notice.note.value in notebook.data.keys():
+        if notebook.has(notice.note.value):
             print(SEPARATOR)
             print(
                 Color.YELLOW
@@ -257,10 +283,10 @@ def contact_manager(book: AddressBook, *_) -> None:
             record_eraser(record, book)
             return
 
-        new_record = deepcopy(record)
+        session = EditSession(record)
 
         print(SEPARATOR)
-        result = get_manager(command)(new_record)
+        result = get_manager(command)(session)
         if result == 1:
             print(SEPARATOR)
             print(SKIPPER)
@@ -268,9 +294,13 @@ def contact_manager(book: AddressBook, *_) -> None:
         if result == 2:
             break
 
-    if save_or_discard(new_record, record):
-        book.delete(record.name.value)
-        book.add_record(new_record)
+    if save_or_discard(session, record):
+        name = record.name.value
+        if session.name.value != name and book.has(session.name.value):
+            raise ValidationError()
+        session.apply()
+        if record.name.value != name:
+            book.rekey(record, name)
         print(SEPARATOR)
         print(Color.GREEN + f"{INDENT}{'Contact updated':<{FIELD}}|" + Color.RESET)
     else:
@@ -393,10 +423,10 @@ def note_manager(notebook: NoteBook, *_) -> None:
             record_eraser(record, notebook)  # type: ignore
             return
 
-        new_record = deepcopy(record)
+        session = EditSession(record)
 
         print(SEPARATOR)
-        result = get_handler(command)(new_record)
+        result = get_handler(command)(session)
         if result == 1:
             print(SEPARATOR)
             print(SKIPPER)
@@ -404,9 +434,13 @@ def note_manager(notebook: NoteBook, *_) -> None:
         if result == 2:
             break
 
-    if save_or_discard(new_record, record):
-        notebook.delete(record.note.value)
-        notebook.add_notice(new_record)
+    if save_or_discard(session, record):
+        note = record.note.value
+        if session.note.value != note and notebook.has(session.note.value):
+            raise ValidationError()
+        session.apply()
+        if record.note.value != note:
+            notebook.rekey(record, note)
         print(SEPARATOR)
         print(Color.GREEN + f"{INDENT}{'Note updated':<{FIELD}}|" + Color.RESET)
     else:
@@ -429,8 +463,8 @@ def get_handler(command: str):
 
     cmd = commands.get(command)
     if not cmd:
-        return invalid_command
-    return cmd
+        return instrument(invalid_command)
+    return instrument(cmd)
 
 
 def note_finder(notebook: NoteBook) -> Notice | int:
@@ -581,17 +615,18 @@ def contact_finder(book: AddressBook) -> Record | None:
 
 
 def save_or_discard(
-    new_record: Record | Notice, *old_record: Record | Notice
+    new_record: Record | Notice | EditSession, *old_record: Record | Notice
 ) -> bool | None:
     """
     Function to save record o note
 
     :param old_record: a dictionary with user contacts or notes to be modified (optional)
-    :param new_record: a dictionary with user contacts or notes that overwrights the original one
+    :param new_record: a dictionary with user contacts or notes that overwrights the original one,
+                       or an edit session of the original one
     :return: True if the record should be saved or None
     """
     print(SEPARATOR)
-    if isinstance(new_record, Record):
+    if isinstance(getattr(new_record, "original", new_record), Record):
         print(HEADER)
     else:
         print(NOTE_HEADER)
@@ -599,6 +634,19 @@ def save_or_discard(
     if old_record:
         print(Color.YELLOW + f"|{'Old':^{COLUMN_1}}|{old_record[0]}|" + Color.RESET)
     print(Color.CYAN + f"|{'New':^{COLUMN_1}}|{new_record}|" + Color.RESET)
+    if not isinstance(getattr(new_record, "original", new_record), Record):
+        rows = (("Old", Color.YELLOW, *old_record), ("New", Color.CYAN, new_record))
+        for label, color, notice in (row for row in rows if len(row) == 3):
+            text = notice.note.value
+            if text == notice.note.preview:
+                continue
+            print(SEPARATOR)
+            for number, line in enumerate(wrap(text, FIELD)):
+                print(
+                    color
+                    + f"|{label if not number else '':^{COLUMN_1}}|{line:<{FIELD}}|"
+                    + Color.RESET
+                )
     print(SEPARATOR)
     print(Color.YELLOW + f"|{'0':^{COLUMN_1}}|{'Discard':<{FIELD}} " + Color.RESET)
     print(Color.CYAN + f"|{'1':^{COLUMN_1}}|{'Save':<{FIELD}} " + Color.RESET)
@@ -817,7 +865,7 @@ def show_all(book: AddressBook | NoteBook, *_) -> None:
             contact list / notebook is empty
     """
     chunk_size = 5
-    sorted_book = dict(sorted(book.items()))
+    sorted_book = book.ordered()
     items = list(sorted_book.values())
     total_items = len(items)
     if not total_items:
@@ -850,7 +898,7 @@ def show_all(book: AddressBook | NoteBook, *_) -> None:
 
 
 @input_error("Invalid command")
-def parse_input(user_input: str) -> Tuple[str, ...]:
+def parse_input(user_input: str) -> tuple[str, ...]:
     """
     Function to parse commands received from the user using the CLI.
 
@@ -0,0 +1,221 @@
+"""Module providing undo and redo of the changes of the books"""
+
+from collections import deque
+
+from source.constants import FIELD, INDENT, SEPARATOR, Color, setting
+from source.events import (
+    BookRestored,
+    FieldSet,
+    PhoneAdded,
+    PhoneChanged,
+    PhoneRemoved,
+    RecordAdded,
+    RecordRemoved,
+    RecordRenamed,
+    TagAdded,
+    TagChanged,
+    TagRemoved,
+)
+
+LIMIT = setting("QBOT_HISTORY", 10_000)
+REVERSIBLE = (
+    RecordAdded,
+    RecordRemoved,
+    RecordRenamed,
+    FieldSet,
+    PhoneAdded,
+    PhoneRemoved,
+    PhoneChanged,
+    TagAdded,
+    TagRemoved,
+    TagChanged,
+)
+session = {"history": None}
+
+
+def revert(event) -> None:
+    """
+    Function to undo the change described by an event.
+    """
+    record = event.record
+    match event:
+        case RecordAdded():
+            event.book.remove(record)
+        case RecordRemoved():
+            event.book.add(record)
+        case FieldSet():
+            record.set_field(event.field, event.old)
+        case PhoneAdded():
+            record.remove_phone(event.index)
+        case PhoneRemoved():
+            record.insert_phone(event.index, event.phone)
+        case PhoneChanged():
+            record.replace_phone(event.index, event.old)
+        case TagAdded():
+            record.remove_tag(event.index)
+        case TagRemoved():
+            record.insert_tag(event.index, event.tag)
+        case TagChanged():
+            record.replace_tag(event.index, event.old)
+
+
+def replay(event) -> None:
+    """
+    Function to make the change described by an event again.
+    """
+    record = event.record
+    match event:
+        case RecordAdded():
+            event.book.add(record)
+        case RecordRemoved():
+            event.book.remove(record)
+        case FieldSet():
+            record.set_field(event.field, event.new)
+        case PhoneAdded():
+            record.insert_phone(event.index, event.phone)
+        case PhoneRemoved():
+            record.remove_phone(event.index)
+        case PhoneChanged():
+            record.replace_phone(event.index, event.new)
+        case TagAdded():
+            record.insert_tag(event.index, event.tag)
+        case TagRemoved():
+            record.remove_tag(event.index)
+        case TagChanged():
+            record.replace_tag(event.index, event.new)
+
+
+class History:
+    """
+    A class keeping the last changes of the books as steps of events to undo and redo.
+
+    The events refer to the changed records and to the former field objects, so a
+    step costs as much memory as the change itself and undoing or redoing it costs
+    as much time. A step is closed by checkpoint(), e.g. after every menu command.
+    The steps to undo and redo keep at most limit changes together: the oldest
+    steps are dropped first, and a single step larger than limit is not kept, so
+    a bulk edit of a big book doesn't pin the old fields in memory. Replacing all
+    records of a book (loading, merging) can't be undone and clears the history.
+    """
+
+    def __init__(self, *books, limit: int = LIMIT):
+        self.limit = limit
+        self.size = 0
+        self.undo_steps = deque()
+        self.redo_steps = []
+        self.pending = []
+        self.replaying = False
+        for book in books:
+            book.subscribe(self.record, BookRestored, *REVERSIBLE, summarized=False)
+
+    def record(self, event) -> None:
+        """
+        A method that adds an event to the current step, called by the books.
+        """
+
+        if self.replaying:
+            return
+        if isinstance(event, BookRestored):
+            self.clear()
+        else:
+            self.pending.append(event)
+
+    def checkpoint(self) -> None:
+        """
+        A method that closes the current step; new changes drop the undone steps.
+        """
+
+        if self.pending:
+            self.size -= sum(map(len, self.redo_steps))
+            self.redo_steps.clear()
+            self.undo_steps.append(self.pending)
+            self.size += len(self.pending)
+            self.pending = []
+            while self.size > self.limit:
+                self.size -= len(self.undo_steps.popleft())
+
+    def clear(self) -> None:
+        """
+        A method that forgets all steps.
+        """
+
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+        self.pending = []
+        self.size = 0
+
+    def undo(self) -> int:
+        """
+        A method that undoes the last step.
+
+        :return: number of undone changes, 0 if there is nothing to undo
+        """
+
+        self.checkpoint()
+        if not self.undo_steps:
+            return 0
+        step = self.undo_steps.pop()
+        self.apply(reversed(step), revert, "key")
+        self.redo_steps.append(step)
+        return len(step)
+
+    def redo(self) -> int:
+        """
+        A method that makes the last undone step again.
+
+        :return: number of changes, 0 if there is nothing to redo
+        """
+
+        self.checkpoint()
+        if not self.redo_steps:
+            return 0
+        step = self.redo_steps.pop()
+        self.apply(step, replay, "old_key")
+        self.undo_steps.append(step)
+        return len(step)
+
+    def apply(self, events, function, stale: str) -> None:
+        """
+        A method that applies a step without recording it; the index entries of the
+        renamed records are moved after their fields are set.
+        """
+
+        renamed = []
+        self.replaying = True
+        try:
+            for event in events:
+                if isinstance(event, RecordRenamed):
+                    renamed.append(event)
+                else:
+                    function(event)
+            for event in renamed:
+                event.book.reindex(event.record, getattr(event, stale))
+        finally:
+            self.replaying = False
+
+
+def undo_command(*_) -> None:
+    """
+    Function to undo the last command that changed the books.
+    """
+    report(session["history"].undo(), "Undone", "Nothing to undo")
+
+
+def redo_command(*_) -> None:
+    """
+    Function to make the last undone command again.
+    """
+    report(session["history"].redo(), "Redone", "Nothing to redo")
+
+
+def report(count: int, done: str, nothing: str) -> None:
+    """
+    Function to display the result of undo or redo.
+    """
+    print(SEPARATOR)
+    if count:
+        print(
+            Color.GREEN + f"{INDENT}{f'{done} {count} changes':<{FIELD}}|" + Color.RESET
+        )
+    else:
+        print(Color.YELLOW + f"{INDENT}{nothing:<{FIELD}}|" + Color.RESET)
@@ -0,0 +1,149 @@
+"""Module providing call counts and latency statistics of the menu commands"""
+
+import builtins
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+from source.constants import COLUMN_1, COLUMN_2, FIELD, INDENT, SEPARATOR, Color
+
+SAMPLES = 10000
+
+
+class CommandStats:
+    """
+    A class collecting the calls of one handler.
+
+    Latency is the time spent in the handler without the time spent waiting for the
+    user in input(); the last SAMPLES calls are kept for the percentiles.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.waited = 0.0
+        self.samples = deque(maxlen=SAMPLES)
+
+    def add(self, busy: float, waited: float) -> None:
+        """
+        A method that records one call.
+        """
+
+        self.calls += 1
+        self.waited += waited
+        self.samples.append(busy)
+
+    def percentile(self, percent: float) -> float:
+        """
+        A method that returns a latency percentile in seconds.
+        """
+
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def to_dict(self) -> dict:
+        """
+        A method that returns the statistics as a dictionary.
+        """
+
+        return {
+            "calls": self.calls,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "waited": self.waited,
+        }
+
+
+STATS: dict[str, CommandStats] = {}
+WRAPPERS = {}
+waiting = {"input": 0.0}
+
+
+@contextmanager
+def timed_input():
+    """
+    Function to replace input() while the menu runs, to account the time spent
+    waiting for the user; input() is restored on exit.
+    """
+    original = builtins.input
+
+    def waited_input(prompt: str = "") -> str:
+        start = time.perf_counter()
+        try:
+            return original(prompt)
+        finally:
+            waiting["input"] += time.perf_counter() - start
+
+    builtins.input = waited_input
+    try:
+        yield
+    finally:
+        builtins.input = original
+
+
+def instrument(func):
+    """
+    Function to wrap a handler so that its calls and latency are recorded.
+
+    :param func: handler
+    :return: wrapped handler, the same wrapper for the same handler
+    """
+    wrapper = WRAPPERS.get(func)
+    if wrapper is not None:
+        return wrapper
+    stats = STATS.setdefault(func.__name__, CommandStats())
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        waited = waiting["input"]
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            waited = waiting["input"] - waited
+            stats.add(elapsed - waited, waited)
+
+    WRAPPERS[func] = wrapper
+    return wrapper
+
+
+def show_stats(*_) -> None:
+    """
+    Function to display the statistics of the handlers called in this session.
+    """
+    print(SEPARATOR)
+    if not STATS:
+        print(Color.YELLOW + f"{INDENT}{'No commands yet':<{FIELD}}|" + Color.RESET)
+        return
+    columns = f"{'calls':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'input s':>10}"
+    header = f"{'HANDLER':<{COLUMN_2 * 2}}{columns}"
+    print(f"|{'#':^{COLUMN_1}}|{header:<{FIELD}}|")
+    print(SEPARATOR)
+    ordered = sorted(STATS.items(), key=lambda item: -item[1].calls)
+    for number, (name, stats) in enumerate(ordered):
+        line = (
+            f"{name:<{COLUMN_2 * 2}}{stats.calls:>8}"
+            f"{stats.percentile(50) * 1000:>10.2f}{stats.percentile(95) * 1000:>10.2f}"
+            f"{stats.percentile(99) * 1000:>10.2f}{stats.waited:>10.1f}"
+        )
+        print(f"|{number + 1:^{COLUMN_1}}|{line:<{FIELD}}|")
+
+
+def dump_stats(target: str) -> None:
+    """
+    Function to dump the statistics on exit.
+
+    :param target: path of a JSON file, or any other value to print them
+    """
+    if target.endswith(".json"):
+        with open(target, "w", encoding="utf-8") as file:
+            json.dump(
+                {name: stats.to_dict() for name, stats in STATS.items()}, file, indent=2
+            )
+    else:
+        show_stats()
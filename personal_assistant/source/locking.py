@@ -0,0 +1,84 @@
+"""Module providing locks for the concurrent access to the books"""
+
+from contextlib import asynccontextmanager, contextmanager
+
+try:
+    import fcntl
+except ImportError:  # advisory locks are not available on Windows
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: str, exclusive: bool):
+    """
+    Context manager holding an advisory lock of a storage file.
+
+    The lock is taken on a separate ".lock" file, so the storage file itself can be
+    replaced while the lock is held.
+
+    :param path: path of the storage file
+    :param exclusive: True for writers, False for readers sharing the lock
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class ReadWriteLock:
+    """
+    An asyncio lock letting in many readers or one writer, waiting writers go first.
+    """
+
+    def __init__(self):
+        import asyncio
+
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @asynccontextmanager
+    async def reading(self):
+        """
+        A method that holds the lock shared with other readers.
+        """
+
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: not self._writer and not self._waiting_writers
+            )
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def writing(self):
+        """
+        A method that holds the lock exclusively.
+        """
+
+        async with self._condition:
+            self._waiting_writers += 1
+            try:
+                await self._condition.wait_for(
+                    lambda: not self._writer and not self._readers
+                )
+            finally:
+                self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writer = False
+                self._condition.notify_all()
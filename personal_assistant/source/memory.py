@@ -0,0 +1,107 @@
+"""Module providing memory accounting of the contact book and the notebook"""
+
+import sys
+import tracemalloc
+from collections import UserDict
+
+from source.constants import COLUMN_1, COLUMN_2, FIELD, INDENT, SEPARATOR, Color
+
+TOP = 10
+baseline = {"snapshot": None}
+
+
+def deep_sizes(*roots) -> dict[str, list]:
+    """
+    Function to measure the memory held by objects, grouped by type.
+
+    Every object is counted once, under the type it is first reached as; the
+    attribute dictionaries of instances are counted as part of the instance and
+    the keys of the books and of their indexes as "key int" and "key str"; text
+    keys are shared with the fields they are made of.
+
+    :param roots: objects to walk
+    :return: [count, bytes] by type name
+    """
+    sizes: dict[str, list] = {}
+    seen = set()
+    stack = [(root, None) for root in roots]
+    while stack:
+        item, label = stack.pop()
+        if item is None or id(item) in seen or isinstance(item, type):
+            continue
+        seen.add(id(item))
+        name = label or type(item).__name__
+        size = sys.getsizeof(item)
+
+        if isinstance(item, UserDict):
+            for mapping in vars(item).values():
+                if isinstance(mapping, dict):
+                    stack.extend((value, None) for value in mapping.values())
+                    stack.extend((key, f"key {type(key).__name__}") for key in mapping)
+                    seen.add(id(mapping))
+                    size += sys.getsizeof(mapping)
+        elif isinstance(item, dict):
+            stack.extend((key, None) for key in item)
+            stack.extend((value, None) for value in item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend((value, None) for value in item)
+        for slot in getattr(type(item), "__slots__", ()):
+            if hasattr(item, slot):
+                stack.append((getattr(item, slot), None))
+        if hasattr(item, "__dict__"):
+            seen.add(id(item.__dict__))
+            size += sys.getsizeof(item.__dict__)
+            stack.extend((value, None) for value in vars(item).values())
+
+        entry = sizes.setdefault(name, [0, 0])
+        entry[0] += 1
+        entry[1] += size
+    return sizes
+
+
+def start_tracing() -> None:
+    """
+    Function to start tracemalloc and remember the snapshot to compare with.
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    baseline["snapshot"] = tracemalloc.take_snapshot()
+
+
+def memory_report(book, notebook=None, *_) -> None:
+    """
+    Function to display the memory held by the books by type and, if tracemalloc
+    was started, the top allocation changes since the start of the session.
+
+    :param book: contact book
+    :param notebook: notebook
+    """
+    roots = [book] if notebook is None else [book, notebook]
+    sizes = deep_sizes(*roots)
+    total = sum(size for _, size in sizes.values()) or 1
+    print(SEPARATOR)
+    header = f"{'TYPE':<{COLUMN_2}}{'objects':>12}{'bytes':>14}{'share':>8}"
+    print(f"|{'#':^{COLUMN_1}}|{header:<{FIELD}}|")
+    print(SEPARATOR)
+    ordered = sorted(sizes.items(), key=lambda item: -item[1][1])
+    for number, (name, (count, size)) in enumerate(ordered):
+        line = f"{name:<{COLUMN_2}}{count:>12}{size:>14}{size / total:>8.1%}"
+        print(f"|{number + 1:^{COLUMN_1}}|{line:<{FIELD}}|")
+    print(f"{INDENT}{f'Total {total} bytes':<{FIELD}}|")
+
+    if baseline["snapshot"] is None:
+        return
+    print(SEPARATOR)
+    print(
+        Color.CYAN
+        + f"{INDENT}{'Allocation changes since start (tracemalloc)':<{FIELD}}|"
+        + Color.RESET
+    )
+    print(SEPARATOR)
+    snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)]
+    )
+    stats = snapshot.compare_to(baseline["snapshot"], "lineno")
+    for number, stat in enumerate(stats[:TOP]):
+        line = f"{str(stat)[:FIELD]}"
+        print(f"|{number + 1:^{COLUMN_1}}|{line:<{FIELD}}|")
@@ -0,0 +1,211 @@
+"""Module providing a parallel scan of very large books in pre-forked processes"""
+
+import atexit
+import os
+import threading
+import weakref
+
+from source.events import BookRestored
+
+THRESHOLD = 100_000
+CHUNKS_PER_WORKER = 4
+
+# the records of the book a pool was forked for, as seen by its workers
+held = {"records": []}
+# pools still running, stopped at exit; each book keeps its own in book.derived
+running = weakref.WeakSet()
+
+
+def default_workers() -> int:
+    """
+    Function to get the number of worker processes, QBOT_WORKERS overrides it.
+
+    :return: number of workers, 1 disables the parallel scan
+    """
+    return int(os.environ.get("QBOT_WORKERS", 0)) or os.cpu_count() or 1
+
+
+def ordered_records(book) -> list:
+    """
+    Function to get the records of a book in key order, sorted once per generation.
+
+    :param book: AddressBook or NoteBook
+    :return: records sorted by key
+    """
+    cached = book.derived.get("ordered")
+    if cached is None or cached[0] != book.generation:
+        cached = book.derived["ordered"] = (
+            book.generation,
+            list(book.ordered().values()),
+        )
+    return cached[1]
+
+
+def can_fork() -> bool:
+    """
+    Function to check whether worker processes can inherit the records through fork:
+    the platform has fork and this process has no threads besides the ones of the
+    running pools, e.g. of the JSON API server, whose locks the children would
+    inherit held.
+    """
+    import multiprocessing
+
+    own = set().union(*(pool.threads for pool in running))
+    return "fork" in multiprocessing.get_all_start_methods() and all(
+        thread is threading.main_thread() or thread in own
+        for thread in threading.enumerate()
+    )
+
+
+def hold(records: list) -> None:
+    """
+    Function run in every worker once, the records come through fork, not pickle.
+    """
+    held["records"] = records
+
+
+def ready(_) -> int:
+    """
+    Function run to make sure a worker is started.
+    """
+    return os.getpid()
+
+
+def scan_chunk(method: str, value: str, start: int, stop: int) -> list[int]:
+    """
+    Function to evaluate the search predicate on a chunk of the held records.
+
+    :return: positions of the matching records
+    """
+    records = held["records"]
+    return [
+        position
+        for position in range(start, stop)
+        if getattr(records[position], method)(value)
+    ]
+
+
+class ScanPool:
+    """
+    A class keeping worker processes forked with the records of a book in key order.
+
+    The pool is valid for one generation of the book; workers return positions of the
+    matches only, so the records are never pickled.
+    """
+
+    def __init__(self, book, workers: int):
+        self.book = book
+        self.generation = book.generation
+        self.records = ordered_records(book)
+        self.workers = workers
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        before = set(threading.enumerate())
+        self.executor = ProcessPoolExecutor(
+            workers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=hold,
+            initargs=(self.records,),
+        )
+        list(self.executor.map(ready, range(workers)))
+        # the threads the executor started to feed and watch the workers
+        self.threads = set(threading.enumerate()) - before
+        running.add(self)
+
+    def valid(self, book, workers: int) -> bool:
+        """
+        A method that checks whether the pool still matches the book.
+        """
+
+        return (
+            self.book is book
+            and self.generation == book.generation
+            and self.workers == workers
+        )
+
+    def scan(self, method: str, value: str) -> list:
+        """
+        A method that runs the predicate on all chunks and merges them in key order.
+        """
+
+        size = len(self.records)
+        step = -(-size // (self.workers * CHUNKS_PER_WORKER))
+        futures = [
+            self.executor.submit(
+                scan_chunk, method, value, start, min(start + step, size)
+            )
+            for start in range(0, size, step)
+        ]
+        return [
+            self.records[position] for future in futures for position in future.result()
+        ]
+
+    def close(self) -> None:
+        """
+        A method that stops the workers.
+        """
+
+        self.executor.shutdown(cancel_futures=True)
+        running.discard(self)
+
+
+def close_pool(book) -> None:
+    """
+    Function to stop the workers of a book, e.g. when all its records are replaced.
+    """
+    pool = book.derived.pop("pool", None)
+    if pool is not None:
+        pool.close()
+
+
+@atexit.register
+def close_pools() -> None:
+    """
+    Function to stop the workers of all books on exit.
+    """
+    for pool in list(running):
+        pool.close()
+
+
+def parallel_scan(book, method: str, value: str, workers: int | None = None) -> list:
+    """
+    Function to select the records of a book matching a search method, in key order.
+
+    Books smaller than THRESHOLD, a single worker or platforms without fork are
+    scanned in this process, as are books without a pool while other threads run;
+    multiprocessing is imported only for large books.
+
+    :param book: AddressBook or NoteBook
+    :param method: name of the search method of the records, e.g. "search_by_name"
+    :param value: value to search for
+    :param workers: number of processes, default_workers() by default
+    :return: matching records
+    """
+    workers = workers or default_workers()
+    if len(book) < THRESHOLD or workers < 2:
+        return [
+            record for record in ordered_records(book) if getattr(record, method)(value)
+        ]
+
+    pool = book.derived.get("pool")
+    if pool is None or not pool.valid(book, workers):
+        close_pool(book)
+        if not can_fork():
+            return [
+                record
+                for record in ordered_records(book)
+                if getattr(record, method)(value)
+            ]
+        pool = book.derived["pool"] = ScanPool(book, workers)
+        book.unsubscribe(close_pool_on_restore)
+        book.subscribe(close_pool_on_restore, BookRestored)
+    return pool.scan(method, value)
+
+
+def close_pool_on_restore(event) -> None:
+    """
+    Function to stop the workers of a book whose records were all replaced, called
+    by the book.
+    """
+    close_pool(event.book)
@@ -0,0 +1,60 @@
+"""Module providing opt-in cProfile hooks around the dispatched commands"""
+
+import cProfile
+import os
+import pstats
+import re
+from datetime import datetime
+
+from source.constants import SEPARATOR
+
+
+class Profiler:
+    """
+    A class profiling each dispatched command.
+
+    Profiles are dumped as <command>-<timestamp>.prof files to the directory, if
+    given, and the top cumulative functions are printed after the command, if top
+    is not zero.
+    """
+
+    def __init__(self, directory: str | None = None, top: int = 0):
+        self.directory = directory
+        self.top = top
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def run(self, name: str, func, *args):
+        """
+        A method that calls the function under the profiler.
+
+        :param name: command name used in the file name
+        :return: result of the function
+        """
+
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func, *args)
+        finally:
+            if self.directory:
+                stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+                command = re.sub(r"[^\w-]", "_", name)
+                filename = f"{command}-{stamp}.prof"
+                profile.dump_stats(os.path.join(self.directory, filename))
+            if self.top:
+                print(SEPARATOR)
+                pstats.Stats(profile).sort_stats("cumulative").print_stats(self.top)
+
+
+def from_environment() -> Profiler | None:
+    """
+    Function to create a profiler from QBOT_PROFILE (directory for the dumps) and
+    QBOT_PROFILE_TOP (number of functions to print) environment variables.
+
+    :return: profiler or None if profiling is not requested
+    """
+    directory = os.environ.get("QBOT_PROFILE")
+    top = int(os.environ.get("QBOT_PROFILE_TOP") or 0)
+    if not directory and not top:
+        return None
+    return Profiler(directory, top)
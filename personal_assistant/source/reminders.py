@@ -0,0 +1,249 @@
+"""Module providing a birthday reminder scheduler kept up to date with the contact book"""
+
+import calendar
+import heapq
+import itertools
+import threading
+from datetime import date, datetime
+
+from source.classes import AddressBook
+from source.constants import COLUMN_1, FIELD, INDENT, SEPARATOR, Color
+from source.events import (
+    BookRestored,
+    Event,
+    FieldSet,
+    RecordAdded,
+    RecordChanged,
+    RecordRemoved,
+)
+
+
+def next_birthday(month: int, day: int, today: date) -> date:
+    """
+    Function to get the next celebration of a birthday from a date on; in other than
+    leap years birthdays on February 29 are celebrated on February 28.
+
+    :return: date of the celebration, today if it is today
+    """
+    for year in (today.year, today.year + 1):
+        celebrated = (
+            28 if (month, day) == (2, 29) and not calendar.isleap(year) else day
+        )
+        if date(year, month, celebrated) >= today:
+            return date(year, month, celebrated)
+    raise ValueError("Invalid birthday")
+
+
+class BirthdayScheduler:
+    """
+    A class keeping the next birthday of every contact in a min-heap.
+
+    Changed and removed contacts are not searched for in the heap: the date
+    scheduled for every id is kept aside with the number of the heap entry made for
+    it, and heap entries that don't match both are dropped when they reach the top,
+    also if the date was changed and changed back. Celebrated birthdays are moved to the next year
+    when the day is over, so every operation costs O(log n). The lock lets a
+    background thread use the scheduler.
+    """
+
+    def __init__(self, book: AddressBook, today: date | None = None):
+        self.book = book
+        self.today = today or datetime.now().date()
+        self.heap = []
+        self.scheduled = {}
+        self.entries = itertools.count()
+        self.lock = threading.RLock()
+        self.reload()
+        book.subscribe(
+            self.update,
+            RecordAdded,
+            RecordRemoved,
+            RecordChanged,
+            FieldSet,
+            BookRestored,
+        )
+
+    def reload(self) -> None:
+        """
+        A method that schedules all contacts of the book again.
+        """
+
+        with self.lock:
+            self.scheduled = {}
+            for record in self.book.values():
+                if record.birthday is not None:
+                    when = next_birthday(
+                        record.birthday.month, record.birthday.day, self.today
+                    )
+                    self.scheduled[record.uid] = (when, next(self.entries))
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        """
+        A method that makes the heap of the scheduled entries only.
+        """
+
+        self.heap = [
+            (when, entry, uid) for uid, (when, entry) in self.scheduled.items()
+        ]
+        heapq.heapify(self.heap)
+
+    def schedule(self, uid: int, when: date) -> None:
+        """
+        A method that pushes a new heap entry for a contact, outdating its old one.
+        """
+
+        entry = next(self.entries)
+        self.scheduled[uid] = (when, entry)
+        heapq.heappush(self.heap, (when, entry, uid))
+
+    def update(self, event: Event) -> None:
+        """
+        A method that reschedules a changed contact, called by the contact book.
+        """
+
+        if isinstance(event, BookRestored):
+            self.reload()
+            return
+        if isinstance(event, FieldSet) and event.field != "birthday":
+            return
+        record = event.record
+        with self.lock:
+            present = self.book.data.get(record.uid) is record
+            if not present or record.birthday is None:
+                self.scheduled.pop(record.uid, None)
+                return
+            birthday = record.birthday
+            when = next_birthday(birthday.month, birthday.day, self.today)
+            if self.scheduled.get(record.uid, (None, None))[0] != when:
+                self.schedule(record.uid, when)
+            if len(self.heap) > 2 * len(self.scheduled) + 64:
+                self.rebuild()
+
+    def advance(self, today: date) -> None:
+        """
+        A method that moves the birthdays celebrated before the date to the next year.
+        """
+
+        with self.lock:
+            self.today = max(self.today, today)
+            while self.heap and self.heap[0][0] < self.today:
+                when, entry, uid = heapq.heappop(self.heap)
+                if self.scheduled.get(uid) != (when, entry):
+                    continue
+                birthday = self.book.data[uid].birthday
+                self.schedule(
+                    uid, next_birthday(birthday.month, birthday.day, self.today)
+                )
+
+    def upcoming(
+        self, count: int, today: date | None = None, until: date | None = None
+    ) -> list:
+        """
+        A method that returns the next birthdays.
+
+        :param count: maximal number of birthdays
+        :param until: last date of the birthdays, not limited by default
+        :return: (date, record) pairs in date order
+        """
+
+        with self.lock:
+            self.advance(today or datetime.now().date())
+            found = []
+            while self.heap and len(found) < count:
+                if until is not None and self.heap[0][0] > until:
+                    break
+                when, entry, uid = heapq.heappop(self.heap)
+                if self.scheduled.get(uid) == (when, entry):
+                    found.append((when, entry, uid))
+            for item in found:
+                heapq.heappush(self.heap, item)
+            return [(when, self.book.data[uid]) for when, _, uid in found]
+
+    def due(self, today: date | None = None) -> list:
+        """
+        A method that returns the contacts celebrating their birthday today.
+        """
+
+        today = today or datetime.now().date()
+        due = self.upcoming(len(self.scheduled), today, until=today)
+        return [record for _, record in due]
+
+
+def scheduler_of(book: AddressBook) -> BirthdayScheduler:
+    """
+    Function to get the scheduler of a contact book, created once per book, so a
+    book kept in memory, e.g. by the daemon, isn't subscribed to again by every call.
+
+    :param book: contact book
+    :return: birthday scheduler kept up to date with the book
+    """
+    scheduler = book.derived.get("scheduler")
+    if scheduler is None:
+        scheduler = book.derived["scheduler"] = BirthdayScheduler(book)
+    return scheduler
+
+
+def due_today(book: AddressBook) -> list:
+    """
+    Function to get the contacts celebrating their birthday today without a
+    scheduler, from the birthday index of the book.
+    """
+    from source.birthday_index import index_of
+
+    today = datetime.now().date()
+    return index_of(book).upcoming(today, today)
+
+
+def show_due(records: list) -> None:
+    """
+    Function to remind of the birthdays of today.
+
+    :param records: contacts celebrating today, e.g. from BirthdayScheduler.due()
+    """
+    for record in records:
+        print(
+            Color.CYAN
+            + f"{INDENT}{'Today is the birthday of ' + record.name.value + '!':<{FIELD}}|"
+            + Color.RESET
+        )
+
+
+def show_next(scheduler: BirthdayScheduler, count: int) -> None:
+    """
+    Function to display the next birthdays.
+
+    :param scheduler: birthday scheduler of the contact book
+    :param count: number of birthdays
+    """
+    print(SEPARATOR)
+    upcoming = scheduler.upcoming(count)
+    if not upcoming:
+        print(f"|{' ' * COLUMN_1}|{'There are no contacts with a birthday':<{FIELD}}|")
+        return
+    for number, (when, record) in enumerate(upcoming):
+        line = f"{when.strftime('%d.%m.%Y')}  {record.name.value}"
+        print(f"|{number + 1:^{COLUMN_1}}|{line:<{FIELD}}|")
+
+
+def start_ticking(scheduler: BirthdayScheduler, interval: float):
+    """
+    Function to check for new birthdays in a background thread, for example after
+    midnight in a long session.
+
+    :param scheduler: birthday scheduler of the contact book
+    :param interval: seconds between the checks
+    :return: event stopping the thread when set
+    """
+    stopped = threading.Event()
+
+    def tick():
+        reminded = scheduler.today
+        while not stopped.wait(interval):
+            today = datetime.now().date()
+            if today != reminded:
+                reminded = today
+                show_due(scheduler.due())
+
+    threading.Thread(target=tick, daemon=True).start()
+    return stopped
@@ -0,0 +1,316 @@
+"""Module providing the revision history of notes in an append-only delta log"""
+
+import os
+import pickle
+import struct
+import time
+from datetime import datetime
+from difflib import SequenceMatcher
+from textwrap import wrap
+
+from source.constants import COLUMN_1, FIELD, INDENT, SEPARATOR, setting
+from source.events import BookRestored, BookSaved, FieldSet, RecordAdded
+from source.locking import file_lock
+
+REVISIONS = "source/revisions.log"
+RETENTION = setting("QBOT_REVISIONS", 20)
+CHECKPOINT = setting("QBOT_CHECKPOINT", 8)
+# note serial, revision number, kind, time and length of the payload
+ENTRY = struct.Struct("<QIBdI")
+FULL = 0
+DELTA = 1
+
+
+def delta(old: str, new: str) -> list:
+    """
+    Function to encode a text as changes of the previous text.
+
+    :return: (start, end) slices of the old text and inserted strings, in order
+    """
+    changes = []
+    matcher = SequenceMatcher(None, old, new, autojunk=False)
+    for tag, start, end, new_start, new_end in matcher.get_opcodes():
+        if tag == "equal":
+            changes.append((start, end))
+        elif new_start < new_end:
+            changes.append(new[new_start:new_end])
+    return changes
+
+
+def patch(old: str, changes: list) -> str:
+    """
+    Function to apply the changes returned by delta() to the previous text.
+    """
+    return "".join(
+        change if isinstance(change, str) else old[change[0] : change[1]]
+        for change in changes
+    )
+
+
+class RevisionLog:
+    """
+    A class keeping the revisions of every note in an append-only file.
+
+    Revisions are stored under the serials of the notices and only when the notebook
+    is saved, so texts of discarded sessions are not kept. A revision is stored as
+    the changes from the previous one, every CHECKPOINT-th revision in full, so any
+    revision is rebuilt from at most CHECKPOINT entries. Only the entry headers are
+    read to index the file. Once more revisions are beyond the last RETENTION of
+    their notes or belong to deleted notes than are kept, the file is rewritten
+    without them; other processes notice the new file and index it again.
+    """
+
+    def __init__(
+        self,
+        path: str = REVISIONS,
+        retention: int = RETENTION,
+        checkpoint: int = CHECKPOINT,
+    ):
+        self.path = path
+        self.retention = retention
+        self.checkpoint = checkpoint
+        self.index = {}
+        self.end = 0
+        self.inode = None
+        self.expired = 0
+        self.pending = {}
+
+    def watch(self, notebook) -> None:
+        """
+        A method that records the new notes and the changed texts of a notebook when
+        it is saved.
+        """
+
+        notebook.subscribe(
+            self.update,
+            RecordAdded,
+            FieldSet,
+            BookRestored,
+            BookSaved,
+            summarized=False,
+        )
+
+    def update(self, event) -> None:
+        """
+        A method that keeps a changed notice with its saved text until the notebook
+        is saved, called by the notebook.
+        """
+
+        if isinstance(event, BookSaved):
+            self.save(event.book)
+        elif isinstance(event, BookRestored):
+            self.restored(event.book)
+        elif isinstance(event, FieldSet):
+            if event.field == "note":
+                self.pending.setdefault(event.record.serial, (event.record, event.old))
+        else:
+            self.pending.setdefault(event.record.serial, (event.record, None))
+
+    def restored(self, notebook) -> None:
+        """
+        A method that keeps the notices whose texts differ from their last revisions
+        after all records of the notebook were replaced, e.g. by a merge on saving;
+        the notices already kept are replaced by the new objects.
+        """
+
+        pending = {}
+        for notice in notebook.data.values():
+            if notice.serial in self.pending:
+                pending[notice.serial] = (notice, self.pending[notice.serial][1])
+        if os.path.exists(self.path):
+            with file_lock(self.path, exclusive=False), open(self.path, "rb") as file:
+                self.scan(file)
+                for notice in notebook.data.values():
+                    entries = self.index.get(notice.serial)
+                    if notice.serial in pending or not entries:
+                        continue
+                    if self.read(file, entries, len(entries) - 1) != notice.note.value:
+                        pending[notice.serial] = (notice, None)
+        self.pending = pending
+
+    def save(self, notebook) -> None:
+        """
+        A method that appends the revisions of the notices changed since the last
+        save of the notebook, the saved text first for notes without revisions.
+        """
+
+        pending, self.pending = self.pending, {}
+        changed = [
+            (notice, old)
+            for notice, old in pending.values()
+            if notebook.data.get(notice.uid) is notice
+        ]
+        if not changed:
+            return
+        with file_lock(self.path, exclusive=True), open(self.path, "ab+") as file:
+            self.scan(file)
+            for notice, old in changed:
+                if old is not None and notice.serial not in self.index:
+                    self.append(file, notice.serial, old.value)
+                self.append(file, notice.serial, notice.note.value)
+            live = {notice.serial for notice in notebook.data.values()}
+            dropped = sum(
+                min(len(entries), self.retention)
+                for serial, entries in self.index.items()
+                if serial not in live
+            )
+            kept = sum(map(len, self.index.values())) - self.expired - dropped
+            if self.expired + dropped > max(64, kept):
+                self.compact(file, live)
+
+    def scan(self, file) -> None:
+        """
+        A method that indexes the entries appended since the last scan, also by
+        other processes, and the whole file again if it was rewritten.
+        """
+
+        stat = os.fstat(file.fileno())
+        if stat.st_ino != self.inode:
+            self.index, self.end, self.inode, self.expired = {}, 0, stat.st_ino, 0
+        while self.end + ENTRY.size <= stat.st_size:
+            file.seek(self.end)
+            serial, number, kind, moment, length = ENTRY.unpack(file.read(ENTRY.size))
+            offset = self.end + ENTRY.size
+            if offset + length > stat.st_size:
+                break
+            entries = self.index.setdefault(serial, [])
+            entries.append((number, kind, moment, offset, length))
+            if len(entries) > self.retention:
+                self.expired += 1
+            self.end = offset + length
+
+    def append(self, file, serial: int, text: str) -> None:
+        """
+        A method that stores a new revision of a note unless the text is unchanged;
+        called under the exclusive lock.
+        """
+
+        entries = self.index.get(serial, [])
+        last = self.read(file, entries, len(entries) - 1) if entries else None
+        if text == last:
+            return
+        full = [entry for entry in entries if entry[1] == FULL]
+        if not full or entries[-1][0] - full[-1][0] + 1 >= self.checkpoint:
+            kind, payload = FULL, text.encode()
+        else:
+            kind, payload = DELTA, pickle.dumps(delta(last, text))
+        number = entries[-1][0] + 1 if entries else 1
+        file.seek(0, os.SEEK_END)
+        file.write(ENTRY.pack(serial, number, kind, time.time(), len(payload)))
+        file.write(payload)
+        file.flush()
+        self.scan(file)
+
+    def read(self, file, entries: list, position: int) -> str:
+        """
+        A method that rebuilds a revision from the last full text before it.
+        """
+
+        start = position
+        while entries[start][1] != FULL:
+            start -= 1
+        text = None
+        for _, kind, _, offset, length in entries[start : position + 1]:
+            file.seek(offset)
+            payload = file.read(length)
+            text = (
+                payload.decode() if kind == FULL else patch(text, pickle.loads(payload))
+            )
+        return text
+
+    def compact(self, file, live: set) -> None:
+        """
+        A method that rewrites the file with the last revisions of every note still
+        in the notebook, the first of them in full; called under the exclusive lock.
+
+        :param live: serials of the notices in the notebook
+        """
+
+        with open(self.path + ".tmp", "wb") as compacted:
+            for serial, entries in self.index.items():
+                if serial not in live:
+                    continue
+                kept = len(entries) - min(len(entries), self.retention)
+                for position in range(kept, len(entries)):
+                    number, kind, moment, offset, length = entries[position]
+                    if position == kept and kind != FULL:
+                        kind = FULL
+                        payload = self.read(file, entries, position).encode()
+                    else:
+                        file.seek(offset)
+                        payload = file.read(length)
+                    compacted.write(
+                        ENTRY.pack(serial, number, kind, moment, len(payload))
+                    )
+                    compacted.write(payload)
+        os.replace(self.path + ".tmp", self.path)
+        self.inode = None
+
+    def revisions(self, serial: int) -> list:
+        """
+        A method that returns the kept revisions of a note.
+
+        :return: (number, time, text) of every revision, oldest first
+        """
+
+        texts = []
+        if not os.path.exists(self.path):
+            return texts
+        with file_lock(self.path, exclusive=False), open(self.path, "rb") as file:
+            self.scan(file)
+            entries = self.index.get(serial, [])
+            for number, kind, moment, offset, length in entries:
+                file.seek(offset)
+                payload = file.read(length)
+                if kind == FULL:
+                    text = payload.decode()
+                else:
+                    text = patch(texts[-1][2], pickle.loads(payload))
+                texts.append((number, moment, text))
+        return texts
+
+    def text(self, serial: int, number: int) -> str | None:
+        """
+        A method that returns the text of a revision of a note.
+
+        :return: text, None if the revision isn't kept
+        """
+
+        if not os.path.exists(self.path):
+            return None
+        with file_lock(self.path, exclusive=False), open(self.path, "rb") as file:
+            self.scan(file)
+            entries = self.index.get(serial, [])
+            for position, entry in enumerate(entries):
+                if entry[0] == number:
+                    return self.read(file, entries, position)
+        return None
+
+
+def show_revisions(revisions: list) -> None:
+    """
+    Function to display the revisions of a note with the beginning of their texts.
+
+    :param revisions: list returned by RevisionLog.revisions
+    """
+    print(SEPARATOR)
+    if not revisions:
+        print(f"{INDENT}{'The note has no revisions':<{FIELD}}|")
+        return
+    for number, moment, text in revisions:
+        when = datetime.fromtimestamp(moment).strftime("%d.%m.%Y %H:%M")
+        line = f"{when}  {' '.join(text.split())}"
+        if len(line) > FIELD:
+            line = line[: FIELD - 3] + "..."
+        print(f"|{number:^{COLUMN_1}}|{line:<{FIELD}}|")
+
+
+def show_revision(number: int, text: str) -> None:
+    """
+    Function to display the text of a revision.
+    """
+    print(SEPARATOR)
+    print(f"|{number:^{COLUMN_1}}|{'Revision ' + str(number):<{FIELD}}|")
+    for paragraph in text.splitlines() or [""]:
+        for line in wrap(paragraph, FIELD) or [""]:
+            print(f"{INDENT}{line:<{FIELD}}|")
@@ -4,6 +4,7 @@ import re
 from typing import Callable, Any
 
 from source.classes import AddressBook
+from source.parallel import parallel_scan
 from source.constants import COLUMN_1, SEPARATOR, FIELD, INDENT, HEADER, Color
 
 
@@ -26,8 +27,7 @@ def search_contacts_by_field(book: AddressBook, *_) -> None:
     if not handler:
         return
 
-    contacts = dict(sorted(book.items()))
-    result = handler(contacts)
+    result = handler(book)
     show_result(result)
 
 
@@ -69,12 +69,7 @@ def search_contacts_by_name(contacts: AddressBook) -> list:
         print(SEPARATOR)
         input_value = input(Color.BLUE + f"{INDENT}{'Enter name'}: " + Color.RESET)
         if 2 < len(input_value) < 21:
-            result = []
-            for number, record in enumerate(contacts.values()):
-                search_by_name = record.search_by_name(input_value)
-                if search_by_name:
-                    result.append(search_by_name)
-            return result
+            return filter_contacts(contacts, "name", input_value)
 
         print(SEPARATOR)
         print(
@@ -97,13 +92,8 @@ def search_contacts_by_phone(contacts: AddressBook) -> list:
         input_value = input(
             Color.BLUE + f"{INDENT}{'Enter phone (ex. +380991234567)'}: " + Color.RESET
         )
-        if re.match(r'^\+?\d+$', input_value):
-            result = []
-            for number, record in enumerate(contacts.values()):
-                search_by_phone = record.search_by_phone(input_value)
-                if search_by_phone:
-                    result.append(search_by_phone)
-            return result
+        if re.match(r"^\+?\d+$", input_value):
+            return filter_contacts(contacts, "phone", input_value)
 
         print(SEPARATOR)
         print(
@@ -126,13 +116,8 @@ def search_contacts_by_birthday(contacts: AddressBook) -> list:
         input_value = input(
             Color.BLUE + f"{INDENT}{'Enter birthday (ex. DD.MM.YYYY)'}: " + Color.RESET
         )
-        if re.match(r'^[\d.]+$', input_value):
-            result = []
-            for number, record in enumerate(contacts.values()):
-                search_by_birthday = record.search_by_birthday(input_value)
-                if search_by_birthday:
-                    result.append(search_by_birthday)
-            return result
+        if re.match(r"^[\d.]+$", input_value):
+            return filter_contacts(contacts, "birthday", input_value)
 
         print(SEPARATOR)
         print(
@@ -158,12 +143,7 @@ def search_contacts_by_email(contacts: AddressBook) -> list:
             + Color.RESET
         )
         if 2 < len(input_value) < 41:
-            result = []
-            for number, record in enumerate(contacts.values()):
-                search_by_email = record.search_by_email(input_value)
-                if search_by_email:
-                    result.append(search_by_email)
-            return result
+            return filter_contacts(contacts, "email", input_value)
 
         print(SEPARATOR)
         print(
@@ -189,12 +169,7 @@ def search_contacts_by_address(contacts: AddressBook) -> list:
             + Color.RESET
         )
         if 2 < len(input_value) < 41:
-            result = []
-            for number, record in enumerate(contacts.values()):
-                search_by_address = record.search_by_address(input_value)
-                if search_by_address:
-                    result.append(search_by_address)
-            return result
+            return filter_contacts(contacts, "address", input_value)
 
         print(SEPARATOR)
         print(
@@ -204,6 +179,19 @@ def search_contacts_by_address(contacts: AddressBook) -> list:
         )
 
 
+def filter_contacts(contacts: AddressBook, field: str, value: str) -> list:
+    """
+    The method for selecting contacts whose field matches the passed value.
+
+    :param contacts: The contacts
+    :param field: The name of the field to search in (name, phone, birthday, email, address)
+    :param value: The value to search for
+    :return: The list of contacts sorted by name
+    """
+
+    return parallel_scan(contacts, f"search_by_{field}", value)
+
+
 def show_result(result: list) -> None:
     """
     The method to display the result.
@@ -3,6 +3,7 @@
 from typing import Callable, Any
 
 from source.classes import NoteBook
+from source.parallel import parallel_scan
 from source.constants import COLUMN_1, SEPARATOR, FIELD, INDENT, NOTE_HEADER, Color
 
 
@@ -23,8 +24,7 @@ def search_notes_by_field(notebook: NoteBook, *_) -> None:
     if not search_method:
         return
 
-    notes_all = dict(sorted(notebook.items()))
-    notes_filtered = search_method(notes_all)
+    notes_filtered = search_method(notebook)
     show_result(notes_filtered)
 
 
@@ -62,12 +62,7 @@ def search_by_tag(notebook: NoteBook) -> list:
 
         input_value = input(Color.BLUE + f"{INDENT}{'Enter tag'}: " + Color.RESET)
         if 1 < len(input_value) < 21:
-            result = []
-            for number, notice in enumerate(notebook.values()):
-                notice_with_tag = notice.search_by_tag(input_value)
-                if notice_with_tag:
-                    result.append(notice_with_tag)
-            return result
+            return filter_notes(notebook, "tag", input_value)
 
         print(SEPARATOR)
         print(
@@ -88,16 +83,9 @@ def search_by_text(notebook: NoteBook) -> list:
     while True:
         print(SEPARATOR)
 
-        input_value = input(
-            Color.BLUE + f"{INDENT}{'Enter text'}: " + Color.RESET
-        )
+        input_value = input(Color.BLUE + f"{INDENT}{'Enter text'}: " + Color.RESET)
         if 1 < len(input_value) < 41:
-            result = []
-            for number, notice in enumerate(notebook.values()):
-                notice_with_text = notice.search_by_note(input_value)
-                if notice_with_text:
-                    result.append(notice_with_text)
-            return result
+            return filter_notes(notebook, "note", input_value)
 
         print(SEPARATOR)
         print(
@@ -107,6 +95,19 @@ def search_by_text(notebook: NoteBook) -> list:
         )
 
 
+def filter_notes(notebook: NoteBook, field: str, value: str) -> list:
+    """
+    The method for selecting notes whose field matches the passed value.
+
+    :param notebook: The notebook
+    :param field: The name of the field to search in (tag, note)
+    :param value: The value to search for
+    :return: The list of notes
+    """
+
+    return parallel_scan(notebook, f"search_by_{field}", value)
+
+
 def show_result(result: list) -> None:
     """
     The method to display the result.
@@ -0,0 +1,263 @@
+"""Module providing saved searches kept up to date with the books"""
+
+import os
+import pickle
+
+from source.constants import COLUMN_1, FIELD, INDENT, SEPARATOR, Color
+from source.events import BookRestored, RecordEvent
+from source.locking import file_lock
+
+SEARCHES = "source/searches.dat"
+FIELDS = {
+    "contacts": ("name", "phone", "birthday", "email", "address"),
+    "notes": ("tag", "note"),
+}
+session = {"searches": None, "books": None}
+
+
+class SavedSearch:
+    """
+    A class for a search of a field of the contacts or notes by a value, with the
+    ids of the records it finds.
+    """
+
+    def __init__(self, kind: str, field: str, value: str):
+        self.kind = kind
+        self.field = field
+        self.value = value
+        self.ids = set()
+
+    def matches(self, item) -> bool:
+        """
+        A method that checks whether a record is found by the search.
+        """
+
+        return getattr(item, f"search_by_{self.field}")(self.value) is not None
+
+    def run(self, book) -> None:
+        """
+        A method that finds the records of the book again.
+        """
+
+        from source.parallel import parallel_scan
+
+        found = parallel_scan(book, f"search_by_{self.field}", self.value)
+        self.ids = {item.uid for item in found}
+
+    def same(self, other: "SavedSearch") -> bool:
+        """
+        A method that checks whether another search is defined the same way.
+        """
+
+        return (self.kind, self.field, self.value) == (
+            other.kind,
+            other.field,
+            other.value,
+        )
+
+    def __str__(self) -> str:
+        return f'{self.kind} by {self.field} "{self.value}"'
+
+
+class SavedSearches:
+    """
+    A class keeping named saved searches of a contact book and a notebook.
+
+    The results are kept as sets of record ids: every change of a record reported by
+    the books checks it against the searches of its book, so opening a search costs
+    only as much as its result. The searches are saved with the versions of the
+    book files; if a file was changed elsewhere, the searches of that book are run
+    again once on loading. The names added and removed are remembered, so saving
+    keeps the searches saved or removed by other sessions meanwhile.
+    """
+
+    def __init__(self, book, notebook, path: str = SEARCHES):
+        self.books = {"contacts": book, "notes": notebook}
+        self.path = path
+        self.searches = {}
+        self.added = set()
+        self.removed = set()
+        self.load()
+        for kind, current in self.books.items():
+            current.subscribe(
+                lambda event, kind=kind: self.update(kind, event),
+                RecordEvent,
+                BookRestored,
+            )
+
+    def stamps(self) -> dict:
+        """
+        A method that returns the versions of the book files the books were loaded
+        from or saved to.
+        """
+
+        return {
+            kind: getattr(book, "snapshot", (None, None))[0]
+            for kind, book in self.books.items()
+        }
+
+    def load(self) -> None:
+        """
+        A method that reads the saved searches, running the stale ones again.
+        """
+
+        with file_lock(self.path, exclusive=False):
+            stamps, self.searches = self.read()
+        self.refresh(self.searches, stamps)
+
+    def read(self) -> tuple[dict, dict]:
+        """
+        A method that reads the saved file, the caller holds the lock.
+
+        :return: versions of the book files and searches by name, empty if missing
+        """
+
+        try:
+            with open(self.path, "rb") as file:
+                return pickle.load(file)
+        except FileNotFoundError:
+            return {}, {}
+
+    def refresh(self, searches: dict, stamps: dict) -> None:
+        """
+        A method that runs again the searches saved with other versions of the books.
+        """
+
+        current = self.stamps()
+        stale = [kind for kind in current if current[kind] != stamps.get(kind)]
+        for search in searches.values():
+            if search.kind in stale:
+                search.run(self.books[search.kind])
+
+    def save(self) -> None:
+        """
+        A method that writes the searches with the versions of the book files.
+
+        The file is read again under the lock: the searches added or removed in this
+        session are applied to it, the others are taken as they are in the file,
+        keeping the results of this session for searches defined the same way.
+        """
+
+        with file_lock(self.path, exclusive=True):
+            stamps, saved = self.read()
+            self.refresh(saved, stamps)
+            for name, search in saved.items():
+                if name in self.searches and self.searches[name].same(search):
+                    saved[name] = self.searches[name]
+            for name in self.removed:
+                saved.pop(name, None)
+            for name in self.added:
+                saved[name] = self.searches[name]
+            with open(self.path + ".tmp", "wb") as file:
+                pickle.dump((self.stamps(), saved), file)
+            os.replace(self.path + ".tmp", self.path)
+        self.searches = saved
+        self.added, self.removed = set(), set()
+
+    def update(self, kind: str, event) -> None:
+        """
+        A method that checks a changed record against the searches of its book,
+        called by the books.
+        """
+
+        book = self.books[kind]
+        searches = [search for search in self.searches.values() if search.kind == kind]
+        if isinstance(event, BookRestored):
+            for search in searches:
+                search.run(book)
+            return
+        item = event.record
+        present = book.data.get(item.uid) is item
+        for search in searches:
+            if present and search.matches(item):
+                search.ids.add(item.uid)
+            else:
+                search.ids.discard(item.uid)
+
+    def add(self, name: str, kind: str, field: str, value: str) -> SavedSearch:
+        """
+        A method that saves a search under a name, replacing a search of that name.
+        """
+
+        search = SavedSearch(kind, field, value)
+        search.run(self.books[kind])
+        self.searches[name] = search
+        self.added.add(name)
+        self.removed.discard(name)
+        return search
+
+    def remove(self, name: str) -> None:
+        """
+        A method that deletes a saved search.
+        """
+
+        del self.searches[name]
+        self.added.discard(name)
+        self.removed.add(name)
+
+    def open(self, name: str) -> list:
+        """
+        A method that returns the records found by a saved search, sorted like the
+        results of the search.
+        """
+
+        search = self.searches[name]
+        book = self.books[search.kind]
+        return sorted((book.data[uid] for uid in search.ids), key=book.sort_key)
+
+
+def show_searches(searches: SavedSearches) -> None:
+    """
+    Function to display the saved searches with the number of their results.
+
+    :param searches: saved searches
+    """
+    print(SEPARATOR)
+    if not searches.searches:
+        print(f"{INDENT}{'There are no saved searches':<{FIELD}}|")
+        return
+    for number, (name, search) in enumerate(sorted(searches.searches.items())):
+        line = f"{name}: {search}, {len(search.ids)} found"
+        print(f"|{number + 1:^{COLUMN_1}}|{line:<{FIELD}}|")
+
+
+def show_search(searches: SavedSearches, name: str) -> bool:
+    """
+    Function to display the records found by a saved search.
+
+    :param searches: saved searches
+    :param name: name of the search
+    :return: False if there is no search with the name
+    """
+    if name not in searches.searches:
+        return False
+    if searches.searches[name].kind == "contacts":
+        from source.search_contacts import show_result
+    else:
+        from source.search_notes import show_result
+    show_result(searches.open(name))
+    return True
+
+
+def session_searches() -> SavedSearches:
+    """
+    Function to get the saved searches of the interactive session, loaded on the
+    first use from the books put in the session.
+    """
+    if session["searches"] is None:
+        session["searches"] = SavedSearches(*session["books"])
+    return session["searches"]
+
+
+def saved_command(_, name: str | None = None, *__) -> None:
+    """
+    Function to list the saved searches or to open one, as a menu command.
+    """
+    searches = session_searches()
+    if name is None:
+        show_searches(searches)
+    elif not show_search(searches, name):
+        print(SEPARATOR)
+        print(
+            Color.RED + f"{INDENT}{'No saved search ' + name:<{FIELD}}|" + Color.RESET
+        )
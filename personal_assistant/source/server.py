@@ -0,0 +1,326 @@
+"""Module providing a local JSON API server over the contact book and the notebook"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from source.birthdays import get_contacts
+from source.classes import (
+    AddressBook,
+    NoteBook,
+    ValidationError,
+    notice_from_dict,
+    record_from_dict,
+)
+from source.search_contacts import filter_contacts
+from source.locking import ReadWriteLock
+from source.search_notes import filter_notes
+from source.storage import loader, save_book, save_notebook
+
+HOST = "127.0.0.1"
+PORT = 8765
+CONTACT_FIELDS = ("name", "phone", "birthday", "email", "address")
+NOTE_FIELDS = ("tag", "note")
+MAX_DAYS = 366
+MAX_BODY = 1 << 20
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Content Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """
+    Error of a request that can not be served, sent to the client as JSON.
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class BookServer:
+    """
+    A class serving one in-memory copy of the books to concurrent local clients.
+
+    Reads run concurrently, writes wait for them and run one at a time under a
+    reader-writer lock; changes are saved, merged with the changes of other
+    processes, before the response is sent.
+    """
+
+    def __init__(self, book: AddressBook, notebook: NoteBook, persist: bool = True):
+        self.book = book
+        self.notebook = notebook
+        self.persist = persist
+        self.lock = ReadWriteLock()
+
+    async def serve_forever(self, host: str = HOST, port: int = PORT) -> None:
+        """
+        A method that accepts connections until cancelled.
+        """
+
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        A method that serves HTTP/1.1 requests of one keep-alive connection.
+        """
+
+        try:
+            while True:
+                try:
+                    head = await read_head(reader)
+                    if head is None:
+                        break
+                    method, target, version, headers = head
+                    body = await reader.readexactly(body_length(headers))
+                except HTTPError as error:
+                    await respond(writer, error.status, {"error": error.message}, False)
+                    break
+
+                status, payload = await self.dispatch(method, target, body)
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                await respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> tuple:
+        """
+        A method that routes a request to a read or a write handler.
+
+        :return: status and JSON payload
+        """
+
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        query = {key: value[-1] for key, value in parse_qs(url.query).items()}
+        try:
+            if method == "GET":
+                async with self.lock.reading():
+                    return 200, self.read(parts, query)
+            if method in ("POST", "PUT", "DELETE"):
+                async with self.lock.writing():
+                    return await self.write(method, parts, body)
+            raise HTTPError(405, "Method not allowed")
+        except HTTPError as error:
+            return error.status, {"error": error.message}
+        except Exception as error:  # e.g. the storage file can't be read or written
+            return 500, {"error": f"{type(error).__name__}: {error}"}
+
+    def read(self, parts: list, query: dict):
+        """
+        A method that serves the read-only endpoints.
+        """
+
+        match parts:
+            case ["contacts"]:
+                return [record.to_dict() for record in self.book.ordered().values()]
+            case ["contacts", "search"]:
+                field, value = search_query(query, CONTACT_FIELDS)
+                return [
+                    record.to_dict()
+                    for record in filter_contacts(self.book, field, value)
+                ]
+            case ["contacts", name]:
+                if not self.book.has(name):
+                    raise HTTPError(404, "Contact not found")
+                return self.book.find(name).to_dict()
+            case ["birthdays"]:
+                try:
+                    days = int(query.get("days", 7))
+                except ValueError as exc:
+                    raise HTTPError(400, "days must be an integer") from exc
+                if not 0 <= days <= MAX_DAYS:
+                    raise HTTPError(400, f"days must be from 0 to {MAX_DAYS}")
+                today = datetime.now().date()
+                contacts = get_contacts(self.book, today, today + timedelta(days=days))
+                return [record.to_dict() for record in contacts]
+            case ["notes"]:
+                return [notice.to_dict() for notice in self.notebook.ordered().values()]
+            case ["notes", "search"]:
+                field, value = search_query(query, NOTE_FIELDS)
+                return [
+                    notice.to_dict()
+                    for notice in filter_notes(self.notebook, field, value)
+                ]
+            case ["notes", note]:
+                if not self.notebook.has(note):
+                    raise HTTPError(404, "Note not found")
+                return self.notebook.find(note).to_dict()
+        raise HTTPError(404, "Unknown endpoint")
+
+    async def write(self, method: str, parts: list, body: bytes):
+        """
+        A method that serves the mutating endpoints, called under the exclusive lock.
+        """
+
+        match method, parts:
+            case "POST", ["contacts"]:
+                record = parse_body(body, record_from_dict)
+                if self.book.has(str(record.name)):
+                    raise HTTPError(409, "Contact already exists")
+                self.book.add_record(record)
+                await self.save(save_book, self.book)
+                return 201, record.to_dict()
+            case "PUT", ["contacts", name]:
+                if not self.book.has(name):
+                    raise HTTPError(404, "Contact not found")
+                record = parse_body(body, record_from_dict)
+                if str(record.name) != name and self.book.has(str(record.name)):
+                    raise HTTPError(409, "Contact already exists")
+                record.uid = self.book.find(name).uid
+                with self.book.transaction():
+                    self.book.delete(name)
+                    self.book.add_record(record)
+                await self.save(save_book, self.book)
+                return 200, record.to_dict()
+            case "DELETE", ["contacts", name]:
+                if not self.book.has(name):
+                    raise HTTPError(404, "Contact not found")
+                self.book.delete(name)
+                await self.save(save_book, self.book)
+                return 200, {"deleted": name}
+            case "POST", ["notes"]:
+                notice = parse_body(body, notice_from_dict)
+                if self.notebook.has(str(notice.note)):
+                    raise HTTPError(409, "Note already exists")
+                self.notebook.add_notice(notice)
+                await self.save(save_notebook, self.notebook)
+                return 201, notice.to_dict()
+            case "DELETE", ["notes", note]:
+                if not self.notebook.has(note):
+                    raise HTTPError(404, "Note not found")
+                self.notebook.delete(note)
+                await self.save(save_notebook, self.notebook)
+                return 200, {"deleted": note}
+        raise HTTPError(404, "Unknown endpoint")
+
+    async def save(self, save, book: AddressBook | NoteBook) -> None:
+        """
+        A method that saves a book without blocking the event loop.
+        """
+
+        if self.persist:
+            await asyncio.get_running_loop().run_in_executor(None, save, book, "merge")
+
+
+async def read_head(reader: asyncio.StreamReader) -> tuple | None:
+    """
+    Function to read the request line and the headers of a request.
+
+    :return: method, target, HTTP version and headers with lower case names, None
+             if the client closed the connection
+    """
+    try:
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, target, version = request_line.decode("latin-1").split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, separator, value = line.decode("latin-1").partition(":")
+            if not separator:
+                raise ValueError(line)
+            headers[key.strip().lower()] = value.strip()
+    except ValueError as exc:  # also a line longer than the limit of the reader
+        raise HTTPError(400, "Malformed request") from exc
+    return method, target, version, headers
+
+
+def body_length(headers: dict) -> int:
+    """
+    Function to get the length of the request body from the headers.
+    """
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError as exc:
+        raise HTTPError(400, "Invalid Content-Length") from exc
+    if length < 0:
+        raise HTTPError(400, "Invalid Content-Length")
+    if length > MAX_BODY:
+        raise HTTPError(413, f"Request body is larger than {MAX_BODY} bytes")
+    return length
+
+
+async def respond(
+    writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool
+) -> None:
+    """
+    Function to send a JSON response.
+    """
+    data = json.dumps(payload).encode()
+    writer.write(
+        (
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        ).encode()
+        + data
+    )
+    await writer.drain()
+
+
+def search_query(query: dict, fields: tuple) -> tuple:
+    """
+    Function to validate the field and the value of a search request.
+
+    :return: field name and value to search for
+    """
+    field = query.get("field", fields[0])
+    if field not in fields or not query.get("q"):
+        raise HTTPError(
+            400, f"field must be one of {', '.join(fields)} and q is required"
+        )
+    return field, query["q"]
+
+
+def parse_body(body: bytes, factory):
+    """
+    Function to create a record or a notice from a JSON request body.
+
+    :return: record or notice
+    """
+    try:
+        data = json.loads(body)
+        if not isinstance(data, dict):
+            raise ValidationError()
+        return factory(data)
+    except (ValueError, TypeError, ValidationError) as exc:
+        raise HTTPError(400, "Invalid record") from exc
+
+
+def serve(host: str = HOST, port: int = PORT) -> None:
+    """
+    Function to load the books and serve them until interrupted.
+    """
+    from source.revisions import RevisionLog
+
+    book, notebook = loader()
+    RevisionLog().watch(notebook)
+    try:
+        asyncio.run(BookServer(book, notebook).serve_forever(host, port))
+    except KeyboardInterrupt:
+        pass
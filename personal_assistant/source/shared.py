@@ -0,0 +1,403 @@
+"""Module providing a read-only copy of the books in shared memory for other processes"""
+
+import os
+import re
+import struct
+import time
+from array import array
+from bisect import bisect_right
+from multiprocessing import resource_tracker, shared_memory
+
+from source.classes import Phone
+
+SEGMENT = "qbot_books"
+MAGIC = b"QBOTSHM1"
+# control segment: magic, sequence (odd while the data name is written), data name,
+# process id of the writer
+CONTROL = struct.Struct("<8sQ64sQ")
+WRITER = struct.calcsize("<8sQ64s")
+# seconds a reader waits for an export being written, and the longest pause between
+# its checks
+TIMEOUT = 5.0
+PAUSE = 0.05
+# data segment: magic, sequence, number of columns, then a directory entry per column
+HEADER = struct.Struct("<8sQI")
+COLUMN = struct.Struct("<24sIQQQ")
+NONE = b"\xff"
+LIST = "\x1f"
+FIELDS = {
+    "contacts": ("name", "phones", "email", "birthday", "address"),
+    "notes": ("note", "tags"),
+}
+SEARCHES = {
+    "contacts": ("name", "phone", "birthday", "email", "address"),
+    "notes": ("note", "tag"),
+}
+
+
+def attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Function to open an existing segment without letting the resource tracker of
+    this process remove it on exit.
+
+    :param name: name of the segment
+    :return: attached segment
+    """
+    segment = shared_memory.SharedMemory(name)
+    resource_tracker.unregister(segment._name, "shared_memory")
+    return segment
+
+
+def running(pid: int) -> bool:
+    """
+    Function to check whether a process exists.
+    """
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # a process of another user
+        return True
+    return True
+
+
+def waiting():
+    """
+    Function to pause between the checks of a reader, longer every time.
+
+    :return: generator pausing on every step, raising TimeoutError after TIMEOUT
+    """
+    deadline = time.monotonic() + TIMEOUT
+    pause = 0.0001
+    while time.monotonic() < deadline:
+        yield
+        time.sleep(pause)
+        pause = min(pause * 2, PAUSE)
+    raise TimeoutError("The exported books were not completed in time")
+
+
+def cell(value) -> bytes:
+    """
+    Function to encode a value of a record for a display column.
+    """
+    if value is None:
+        return NONE
+    if isinstance(value, list):
+        value = LIST.join(value)
+    return value.encode()
+
+
+def columns_of(book, notebook) -> dict:
+    """
+    Function to get the cells of every column of the books in the order of the books.
+
+    Display columns hold the values of Record.to_dict and Notice.to_dict, search
+    columns ("<book>.<field>.search") hold the values the search_by_ methods compare
+    with: lower case texts, str() of missing fields and canonical phone numbers.
+
+    :return: encoded cells by column name
+    """
+    columns = {f"{kind}.{field}": [] for kind in FIELDS for field in FIELDS[kind]} | {
+        f"{kind}.{field}.search": [] for kind in SEARCHES for field in SEARCHES[kind]
+    }
+    for record in book.values():
+        data = record.to_dict()
+        for field in FIELDS["contacts"]:
+            columns[f"contacts.{field}"].append(cell(data[field]))
+        phones = LIST.join(
+            f"+{phone.digits:0{Phone.DIGITS}d}" for phone in record.phones
+        )
+        searches = {
+            "name": data["name"].lower(),
+            "phone": phones,
+            "birthday": str(data["birthday"]),
+            "email": str(data["email"]).lower(),
+            "address": str(data["address"]).lower(),
+        }
+        for field, value in searches.items():
+            columns[f"contacts.{field}.search"].append(value.encode())
+    for notice in notebook.values():
+        data = notice.to_dict()
+        for field in FIELDS["notes"]:
+            columns[f"notes.{field}"].append(cell(data[field]))
+        columns["notes.note.search"].append(data["note"].lower().encode())
+        columns["notes.tag.search"].append(LIST.join(data["tags"]).lower().encode())
+    return columns
+
+
+def layout(columns: dict, sequence: int) -> bytearray:
+    """
+    Function to lay out the columns one after another.
+
+    Every column is an array of uint32 offsets of its cells, one more than the rows,
+    followed by the cells, each ended by a zero byte so a search can't match across
+    two cells.
+
+    :return: contents of the data segment
+    """
+    directory = []
+    blocks = []
+    position = HEADER.size + COLUMN.size * len(columns)
+    for name, cells in columns.items():
+        offsets = array("I", [0])
+        for value in cells:
+            offsets.append(offsets[-1] + len(value) + 1)
+        data = b"\0".join(cells) + b"\0" if cells else b""
+        position += -position % offsets.itemsize
+        directory.append(
+            COLUMN.pack(
+                name.encode(),
+                len(cells),
+                position,
+                position + len(offsets) * offsets.itemsize,
+                len(data),
+            )
+        )
+        blocks.append((position, offsets.tobytes() + data))
+        position += len(blocks[-1][1])
+    contents = bytearray(position)
+    HEADER.pack_into(contents, 0, MAGIC, sequence, len(columns))
+    contents[HEADER.size : HEADER.size + COLUMN.size * len(columns)] = b"".join(
+        directory
+    )
+    for start, block in blocks:
+        contents[start : start + len(block)] = block
+    return contents
+
+
+class SharedExport:
+    """
+    A class publishing the books of this process to other local processes.
+
+    Every export is written to a new data segment and announced in a small control
+    segment with a sequence number, then the previous data segment is removed;
+    readers still attached to it keep their mapping until they move on. The control
+    segment names the writer process, so the segments of a writer that was killed
+    are taken over, while a running writer keeps them.
+    """
+
+    def __init__(self, name: str = SEGMENT):
+        self.name = name
+        self.data = None
+        self.version = None
+        try:
+            self.control = shared_memory.SharedMemory(
+                name, create=True, size=CONTROL.size
+            )
+            self.sequence = 0
+        except FileExistsError:
+            control = attach(name)
+            _, sequence, stale, writer = CONTROL.unpack_from(control.buf)
+            if writer != os.getpid() and running(writer):
+                control.close()
+                raise FileExistsError(
+                    f"The books are exported by the process {writer}"
+                ) from None
+            # left by a writer that was killed, taken over and removed by this one
+            resource_tracker.register(control._name, "shared_memory")
+            self.control = control
+            self.sequence = sequence | 1
+            try:
+                shared_memory.SharedMemory(stale.rstrip(b"\0").decode()).unlink()
+            except (OSError, ValueError):
+                pass
+        struct.pack_into("<Q", self.control.buf, WRITER, os.getpid())
+
+    def refresh(self, book, notebook) -> bool:
+        """
+        A method that exports the books if they were changed since the last export.
+
+        :return: True if the books were exported
+        """
+
+        version = (id(book), book.generation, id(notebook), notebook.generation)
+        if version == self.version:
+            return False
+        sequence = (self.sequence | 1) + 1
+        contents = layout(columns_of(book, notebook), sequence)
+        data = shared_memory.SharedMemory(
+            f"{self.name}_{sequence}", create=True, size=len(contents)
+        )
+        data.buf[: len(contents)] = contents
+        struct.pack_into("<Q", self.control.buf, 8, sequence - 1)
+        CONTROL.pack_into(
+            self.control.buf, 0, MAGIC, sequence - 1, data.name.encode(), os.getpid()
+        )
+        struct.pack_into("<Q", self.control.buf, 8, sequence)
+        if self.data is not None:
+            self.data.close()
+            self.data.unlink()
+        self.data, self.sequence, self.version = data, sequence, version
+        return True
+
+    def close(self) -> None:
+        """
+        A method that removes the segments, the control segment only if no other
+        writer took it over.
+        """
+
+        if self.data is not None:
+            self.data.close()
+            self.data.unlink()
+        if self.control is not None:
+            writer = struct.unpack_from("<Q", self.control.buf, WRITER)[0]
+            self.control.close()
+            if writer == os.getpid():
+                self.control.unlink()
+        self.data = self.control = None
+
+
+class SharedBooks:
+    """
+    A class reading the books exported by another process, without copying them.
+
+    Searches run the re module over the cells in shared memory and return row
+    numbers; only the rows asked for with row() are decoded. Before every search
+    the sequence of the control segment is checked and a newer export is attached.
+    """
+
+    def __init__(self, name: str = SEGMENT):
+        self.control = attach(name)
+        self.data = None
+        self.views = []
+        self.columns = {}
+        self.sequence = None
+        self.attach()
+
+    def published(self) -> tuple[int, str]:
+        """
+        A method that reads the sequence and the name of the current export, waiting
+        while it is written.
+        """
+
+        for _ in waiting():
+            magic, sequence, name, writer = CONTROL.unpack_from(self.control.buf)
+            if magic != MAGIC:
+                raise FileNotFoundError("Books are not exported yet")
+            if sequence % 2 == 0 and (
+                struct.unpack_from("<Q", self.control.buf, 8)[0] == sequence
+            ):
+                return sequence, name.rstrip(b"\0").decode()
+            if not running(writer):
+                raise FileNotFoundError("The writer of the books has stopped")
+
+    def stale(self) -> bool:
+        """
+        A method that checks whether the books were exported again.
+        """
+
+        return struct.unpack_from("<Q", self.control.buf, 8)[0] != self.sequence
+
+    def attach(self) -> None:
+        """
+        A method that maps the current export, retrying if it is replaced meanwhile.
+        """
+
+        for _ in waiting():
+            sequence, name = self.published()
+            try:
+                data = attach(name)
+            except FileNotFoundError:
+                continue
+            break
+        self.release()
+        self.data, self.sequence = data, sequence
+        buffer = self.view(data.buf)
+        _, _, count = HEADER.unpack_from(buffer)
+        for number in range(count):
+            name, rows, offsets, start, length = COLUMN.unpack_from(
+                buffer, HEADER.size + COLUMN.size * number
+            )
+            self.columns[name.rstrip(b"\0").decode()] = (
+                self.view(buffer[offsets:start].cast("I")),
+                self.view(buffer[start : start + length]),
+            )
+
+    def view(self, view: memoryview) -> memoryview:
+        """
+        A method that keeps a view of the segment to release it before detaching.
+        """
+
+        self.views.append(view)
+        return view
+
+    def release(self) -> None:
+        """
+        A method that detaches from the current export.
+        """
+
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        self.columns = {}
+        if self.data is not None:
+            self.data.close()
+            self.data = None
+
+    def count(self, kind: str) -> int:
+        """
+        A method that returns the number of contacts or notes.
+
+        :param kind: "contacts" or "notes"
+        """
+
+        return len(self.columns[f"{kind}.{FIELDS[kind][0]}"][0]) - 1
+
+    def search(self, kind: str, field: str, value: str) -> list[int]:
+        """
+        A method that finds the rows matching a value the way search_by_<field> does.
+
+        :param kind: "contacts" or "notes"
+        :param field: one of SEARCHES[kind]
+        :return: numbers of the matching rows
+        """
+
+        if self.stale():
+            self.attach()
+        if field == "phone":
+            value = Phone.SEPARATORS.sub("", value)
+        elif field != "birthday":
+            value = value.lower()
+        offsets, data = self.columns[f"{kind}.{field}.search"]
+        pattern = re.compile(re.escape(value.encode()))
+        rows = []
+        position = 0
+        while position < len(data) and (match := pattern.search(data, position)):
+            row = bisect_right(offsets, match.start()) - 1
+            rows.append(row)
+            position = offsets[row + 1]
+        return rows
+
+    def row(self, kind: str, row: int) -> dict:
+        """
+        A method that decodes a row found by search() as Record.to_dict or
+        Notice.to_dict would return it.
+        """
+
+        values = {}
+        for field in FIELDS[kind]:
+            offsets, data = self.columns[f"{kind}.{field}"]
+            value = bytes(data[offsets[row] : offsets[row + 1] - 1])
+            if value == NONE:
+                values[field] = None
+            elif field in ("phones", "tags"):
+                values[field] = value.decode().split(LIST) if value else []
+            else:
+                values[field] = value.decode()
+        return values
+
+    def close(self) -> None:
+        """
+        A method that detaches from the segments.
+        """
+
+        self.release()
+        self.control.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
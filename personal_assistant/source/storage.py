@@ -0,0 +1,290 @@
+"""Module providing functions to load and save the contact book and the notebook"""
+
+import os
+import pickle
+
+from source.blobs import BlobStore
+from source.classes import AddressBook, NoteBook
+from source.events import BookSaved
+from source.locking import file_lock
+
+BACKUP = "source/backup.dat"
+STORAGE = "source/storage.dat"
+NOTES = "source/notes.blob"
+stores = {}
+
+
+class StaleSnapshotError(Exception):
+    """
+    Error of saving a book over a file changed by another process since loading.
+    """
+
+
+def file_stamp(path: str) -> tuple | None:
+    """
+    Function to identify the version of a storage file.
+
+    :param path: path of the storage file
+    :return: modification time, size and inode, or None if there is no file
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def read_file(path: str) -> tuple:
+    """
+    Function to read a storage file under a shared lock.
+
+    :param path: path of the storage file
+    :return: version of the file (see file_stamp) and its bytes, None if there is no file
+    """
+    with file_lock(path, exclusive=False):
+        stamp = file_stamp(path)
+        try:
+            with open(path, "rb") as file:
+                raw = file.read()
+        except FileNotFoundError:
+            raw = None
+    return stamp, raw
+
+
+def load_file(book: AddressBook | NoteBook, path: str) -> AddressBook | NoteBook:
+    """
+    Function to load a book from a storage file under a shared lock.
+
+    The loaded version is kept in book.snapshot to detect concurrent changes on save.
+
+    :param book: empty contact book or notebook
+    :param path: path of the storage file
+    :return: loaded book
+    """
+    stamp, raw = read_file(path)
+    if raw is not None:
+        book.restore(pickle.loads(raw).values())
+    book.snapshot = (stamp, raw)
+    return book
+
+
+def save_file(
+    book: AddressBook | NoteBook,
+    path: str,
+    strategy: str = "error",
+    empty: bool = False,
+) -> list:
+    """
+    Function to save a book to a storage file under an exclusive lock.
+
+    :param book: contact book or notebook
+    :param path: path of the storage file
+    :param strategy: what to do if the file was changed since loading:
+                     "error" raises StaleSnapshotError, "merge" merges both
+                     versions, "overwrite" replaces the file
+    :param empty: whether an empty book is written too, otherwise it is skipped
+    :return: keys changed in both versions, saved as in this book
+    """
+    conflicts = []
+    with file_lock(path, exclusive=True):
+        stamp, raw = getattr(book, "snapshot", (None, None))
+        if file_stamp(path) != stamp:
+            if strategy == "error":
+                raise StaleSnapshotError(path)
+            if strategy == "merge":
+                base, theirs = book.empty(), book.empty()
+                if raw:
+                    base.restore(pickle.loads(raw).values())
+                try:
+                    with open(path, "rb") as file:
+                        theirs.restore(pickle.load(file).values())
+                except FileNotFoundError:
+                    pass
+                ours = book.ordered()
+                merged, conflicts = merge(base.ordered(), ours, theirs.ordered())
+                own = {id(item) for item in ours.values()}
+                book.restore(
+                    sorted(merged.values(), key=lambda item: id(item) not in own)
+                )
+        if not book.data and not empty:
+            return conflicts
+        raw = pickle.dumps(book.data)
+        with open(path + ".tmp", "wb") as file:
+            file.write(raw)
+        os.replace(path + ".tmp", path)
+        book.snapshot = (file_stamp(path), raw)
+    book.deliver(BookSaved(book))
+    return conflicts
+
+
+def merge(base: dict, ours: dict, theirs: dict) -> tuple[dict, list]:
+    """
+    Function to merge two versions of book records changed from the same base.
+
+    A record changed on one side only takes that change, including deletion.
+    A record changed differently on both sides keeps our version.
+
+    :param base: records by key as they were loaded
+    :param ours: records by key of this process
+    :param theirs: records by key saved by another process
+    :return: merged records by key and the keys of the conflicting records
+    """
+    merged = {}
+    conflicts = []
+    for key in {**base, **ours, **theirs}:
+        base_state, our_state, their_state = (
+            None if key not in data else data[key].to_dict()
+            for data in (base, ours, theirs)
+        )
+        if our_state == their_state or their_state == base_state:
+            chosen = ours
+        elif our_state == base_state:
+            chosen = theirs
+        else:
+            chosen = ours
+            conflicts.append(key)
+        if key in chosen:
+            merged[key] = chosen[key]
+    return merged, conflicts
+
+
+def load_book() -> AddressBook:
+    """
+    Function to load saved contact book.
+
+    :return: contact book
+    """
+    return load_file(AddressBook(), BACKUP)
+
+
+def blob_store(path: str | None = None) -> BlobStore:
+    """
+    Function to open the store of note texts, once per file.
+
+    :param path: path of the blob file, NOTES as it is at the call by default
+    :return: blob store shared by the notebooks of the file
+    """
+    if path is None:
+        path = NOTES
+    if path not in stores:
+        stores[path] = BlobStore(path)
+    return stores[path]
+
+
+def load_notebook() -> NoteBook:
+    """
+    Function to load saved notebook; note texts stay in the blob store.
+
+    :return: notebook
+    """
+    return load_file(NoteBook(blob_store()), STORAGE)
+
+
+def loader() -> tuple[AddressBook, NoteBook]:
+    """
+    Function to load saved contact book and notebook.
+
+    :return: contact book and notebook
+    """
+    return (load_book(), load_notebook())
+
+
+def save_book(book: AddressBook, strategy: str = "error") -> list:
+    """
+    Function to save contact book to file.
+
+    :param book: contact book
+    :param strategy: "error", "merge" or "overwrite", see save_file
+    :return: names of the conflicting records
+    """
+    return save_file(book, BACKUP, strategy)
+
+
+def save_notebook(notebook: NoteBook, strategy: str = "error") -> list:
+    """
+    Function to save notebook to file.
+
+    :param notebook: notebook
+    :param strategy: "error", "merge" or "overwrite", see save_file
+    :return: conflicting notes
+    """
+    if notebook.store is None:
+        notebook.store = blob_store()
+    for notice in notebook.values():
+        notice.note.offload(notebook.store)
+    return save_file(notebook, STORAGE, strategy)
+
+
+def saver(book: AddressBook, notebook: NoteBook, strategy: str = "error") -> None:
+    """
+    Function to save contact book and notebook to files.
+
+    :param book: contact book
+    :param notebook: notebook
+    :param strategy: "error", "merge" or "overwrite", see save_file
+    """
+    save_book(book, strategy)
+    save_notebook(notebook, strategy)
+
+
+class Books:
+    """
+    A class giving subcommands access to the contact book and the notebook.
+
+    Books are loaded from the files on first use unless resident copies are given.
+    """
+
+    def __init__(
+        self, book: AddressBook | None = None, notebook: NoteBook | None = None
+    ):
+        self._book = book
+        self._notebook = notebook
+
+    @property
+    def book(self) -> AddressBook:
+        """
+        A method that returns the contact book, loading it if needed.
+        """
+
+        if self._book is None:
+            self._book = load_book()
+        return self._book
+
+    @property
+    def notebook(self) -> NoteBook:
+        """
+        A method that returns the notebook, loading it if needed.
+        """
+
+        if self._notebook is None:
+            self._notebook = load_notebook()
+        return self._notebook
+
+    def refresh(self) -> None:
+        """
+        A method that drops loaded books whose files were changed by another process.
+        """
+
+        if self._book is not None and file_stamp(BACKUP) != self._book.snapshot[0]:
+            self._book = None
+        if (
+            self._notebook is not None
+            and file_stamp(STORAGE) != self._notebook.snapshot[0]
+        ):
+            self._notebook = None
+
+    def save_book(self) -> None:
+        """
+        A method that saves the contact book if it was loaded, merging concurrent changes.
+        """
+
+        if self._book is not None:
+            save_book(self._book, "merge")
+
+    def save_notebook(self) -> None:
+        """
+        A method that saves the notebook if it was loaded, merging concurrent changes.
+        """
+
+        if self._notebook is not None:
+            save_notebook(self._notebook, "merge")
@@ -0,0 +1,419 @@
+"""Module providing Merkle trees of storage files to compare and merge their copies"""
+
+import copy
+import functools
+import hashlib
+import os
+import pickle
+import zlib
+
+from source.blobs import BlobStore
+from source.classes import AddressBook, Notice, NoteBook, Record
+from source.constants import COLUMN_1, FIELD, INDENT, SEPARATOR, Color
+from source.storage import NOTES, file_stamp, read_file, save_file
+
+# the tree has DEPTH levels of FANOUT children above 2**(BITS * DEPTH) buckets
+BITS = 4
+FANOUT = 1 << BITS
+DEPTH = 4
+VERSION = 1
+SIDECAR = ".merkle"
+
+
+def digest(data: bytes) -> bytes:
+    """
+    Function to hash a leaf or a node of a tree.
+
+    :return: 16 bytes digest
+    """
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def bucket_of(key) -> int:
+    """
+    Function to get the bucket of a record key, the same in every copy of a book.
+
+    :param key: name of a contact or digest of a note
+    :return: number of the bucket below 2**(BITS * DEPTH)
+    """
+    data = key.encode() if isinstance(key, str) else key
+    return zlib.crc32(data) >> (32 - BITS * DEPTH)
+
+
+def leaf_of(key, item) -> bytes:
+    """
+    Function to hash a record with its key; phones are hashed by their digits and a
+    notice by its digest and tags, so the text isn't read.
+
+    :return: 16 bytes digest
+    """
+    if isinstance(item, Record):
+        state = [phone.digits for phone in item.phones]
+        for field in (item.email, item.birthday, item.address):
+            state.append(None if field is None else field.value)
+    else:
+        state = [tag.value for tag in item.tags]
+    return digest(repr((key, state)).encode())
+
+
+class MerkleTree:
+    """
+    A class hashing the records of a book into a tree of fixed shape.
+
+    Records are spread over buckets by a hash of their key, a bucket hashes the
+    sorted (key, record hash) pairs and every node hashes its non-empty children.
+    Two copies of a book have equal nodes wherever their records are equal, so
+    comparing them only descends into differing nodes: O(changes * log n). A
+    change of one record rehashes only its path.
+    """
+
+    def __init__(self, stamp=None):
+        self.stamp = stamp
+        self.levels = [{} for _ in range(DEPTH + 1)]
+        self.dirty = set()
+        self.buckets = {}
+
+    @classmethod
+    def build(cls, book, stamp=None) -> "MerkleTree":
+        """
+        A method that hashes all records of a book.
+
+        :param stamp: version of the file the book was loaded from
+        """
+
+        tree = cls(stamp)
+        buckets = tree.buckets
+        for key, uid in book.index.items():
+            buckets.setdefault(bucket_of(key), {})[key] = leaf_of(key, book.data[uid])
+        tree.dirty = set(buckets)
+        tree.refresh()
+        return tree
+
+    @classmethod
+    def load(cls, path: str, stamp) -> "MerkleTree | None":
+        """
+        A method that reads a saved tree if it was built for the version of the file.
+
+        :return: tree, None if it isn't saved or is stale
+        """
+
+        try:
+            with open(path, "rb") as file:
+                version, saved_stamp, levels, buckets = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return None
+        if version != VERSION or saved_stamp != stamp:
+            return None
+        tree = cls(stamp)
+        tree.levels = levels
+        tree.buckets = buckets
+        return tree
+
+    def save(self, path: str) -> None:
+        """
+        A method that writes the tree next to the storage file, ignoring errors; every
+        bucket is pickled on its own, so reading the tree unpickles only the buckets
+        that are looked into.
+        """
+
+        buckets = {
+            bucket: pickle.dumps(entries) if isinstance(entries, dict) else entries
+            for bucket, entries in self.buckets.items()
+        }
+        try:
+            with open(path + ".tmp", "wb") as file:
+                pickle.dump((VERSION, self.stamp, self.levels, buckets), file)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            pass
+
+    def entries(self, bucket: int) -> dict:
+        """
+        A method that returns the record hashes by key in a bucket, unpickling it if
+        the tree was read from a file.
+        """
+
+        entries = self.buckets.get(bucket)
+        if isinstance(entries, bytes):
+            entries = self.buckets[bucket] = pickle.loads(entries)
+        return {} if entries is None else entries
+
+    @property
+    def root(self) -> bytes | None:
+        """
+        A method that returns the hash of all records, None for an empty book.
+        """
+
+        return self.levels[0].get(0)
+
+    def leaf(self, key) -> bytes | None:
+        """
+        A method that returns the hash of the record with the key, None if missing.
+        """
+
+        return self.entries(bucket_of(key)).get(key)
+
+    def set(self, key, leaf: bytes | None) -> None:
+        """
+        A method that changes the hash of a record, removes it if None; the nodes
+        are updated by refresh().
+        """
+
+        bucket = bucket_of(key)
+        entries = self.buckets[bucket] = self.entries(bucket)
+        if leaf is None:
+            entries.pop(key, None)
+        else:
+            entries[key] = leaf
+        self.dirty.add(bucket)
+
+    def refresh(self) -> None:
+        """
+        A method that rehashes the buckets changed by set() and their ancestors.
+        """
+
+        nodes = self.levels[DEPTH]
+        for bucket in self.dirty:
+            entries = self.entries(bucket)
+            if entries:
+                nodes[bucket] = digest(
+                    b"".join(
+                        repr(key).encode() + entries[key] for key in sorted(entries)
+                    )
+                )
+            else:
+                self.buckets.pop(bucket, None)
+                nodes.pop(bucket, None)
+        dirty = self.dirty
+        for level in range(DEPTH - 1, -1, -1):
+            children = self.levels[level + 1]
+            dirty = {prefix >> BITS for prefix in dirty}
+            for prefix in dirty:
+                first = prefix << BITS
+                hashes = [
+                    bytes([position]) + children[first + position]
+                    for position in range(FANOUT)
+                    if first + position in children
+                ]
+                if hashes:
+                    self.levels[level][prefix] = digest(b"".join(hashes))
+                else:
+                    self.levels[level].pop(prefix, None)
+        self.dirty = set()
+
+    def diff(self, other: "MerkleTree") -> set:
+        """
+        A method that finds the keys of the records that differ from another tree.
+        """
+
+        keys = set()
+        stack = [(0, 0)]
+        while stack:
+            level, prefix = stack.pop()
+            if self.levels[level].get(prefix) == other.levels[level].get(prefix):
+                continue
+            if level == DEPTH:
+                mine = self.entries(prefix)
+                theirs = other.entries(prefix)
+                keys.update(
+                    key
+                    for key in mine.keys() | theirs.keys()
+                    if mine.get(key) != theirs.get(key)
+                )
+            else:
+                first = prefix << BITS
+                stack.extend(
+                    (level + 1, first + position) for position in range(FANOUT)
+                )
+        return keys
+
+
+class Copy:
+    """
+    A class for a storage file taking part in a sync.
+
+    The tree is kept in a file next to it and rebuilt only if the storage file was
+    changed, the records are loaded only if they are needed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._book = None
+        self.changed = False
+        stamp = file_stamp(path)
+        self.tree = MerkleTree.load(path + SIDECAR, stamp)
+        if self.tree is None:
+            self.tree = MerkleTree.build(self.book, self.book.snapshot[0])
+            self.tree.save(path + SIDECAR)
+
+    @property
+    def book(self) -> AddressBook | NoteBook:
+        """
+        A method that returns the book of the file, loading it if needed.
+        """
+
+        if self._book is None:
+            stamp, raw = read_file(self.path)
+            items = list(pickle.loads(raw).values()) if raw else []
+            self._book = (
+                NoteBook(self.store)
+                if isinstance(next(iter(items), None), Notice)
+                else AddressBook()
+            )
+            self._book.restore(items)
+            self._book.snapshot = (stamp, raw)
+            if self.tree is not None and self.tree.stamp != stamp:
+                self.tree = MerkleTree.build(self._book, stamp)
+        return self._book
+
+    @functools.cached_property
+    def store(self) -> BlobStore:
+        """
+        A method that returns the store of the note texts next to the file, created
+        once per copy.
+        """
+
+        return BlobStore(
+            os.path.join(os.path.dirname(self.path), os.path.basename(NOTES))
+        )
+
+    def take(self, source: "Copy", key) -> None:
+        """
+        A method that replaces the record with the key by its version in another
+        copy, removes it if it isn't there.
+        """
+
+        book = self.book
+        if key in book.index:
+            book.delete_key(key)
+        if key in source.book.index:
+            item = copy.deepcopy(source.book.data[source.book.index[key]])
+            if isinstance(item, Notice):
+                note = item.note
+                if note.offset is not None:
+                    note.value = source.store.get(note.offset, note.length)
+                note.offload(self.store)
+            book.add(item)
+        self.tree.set(key, source.tree.leaf(key))
+        self.changed = True
+
+    def save(self) -> None:
+        """
+        A method that saves the changed book and its tree and unmaps the note texts.
+        """
+
+        if self.changed:
+            # a sync may remove every record, the empty book is written as well
+            save_file(self.book, self.path, empty=True)
+            self.tree.stamp = self.book.snapshot[0]
+            self.tree.refresh()
+            self.tree.save(self.path + SIDECAR)
+        if "store" in vars(self):
+            self.store.close()
+
+
+def same_kind(ours: Copy, theirs: Copy) -> bool:
+    """
+    Function to check that both copies hold contacts or both hold notes; an empty
+    copy takes the kind of the other.
+    """
+    for one, other in ((ours, theirs), (theirs, ours)):
+        if not one.book.data and type(one.book) is not type(other.book):
+            snapshot = one.book.snapshot
+            one._book = (
+                NoteBook(one.store)
+                if isinstance(other.book, NoteBook)
+                else AddressBook()
+            )
+            one._book.snapshot = snapshot
+    return type(ours.book) is type(theirs.book)
+
+
+def name_of(key, *copies) -> str:
+    """
+    Function to get the name of a contact or the preview of a note in the copies.
+    """
+    if isinstance(key, str):
+        return key
+    book = next(one.book for one in copies if key in one.book.index)
+    return book.data[book.index[key]].note.preview
+
+
+def describe(new: bytes | None, old: bytes | None) -> str:
+    """
+    Function to name the change of a record between two hashes.
+    """
+    if old is None:
+        return "added"
+    return "removed" if new is None else "changed"
+
+
+def compare(ours: Copy, theirs: Copy, base: Copy | None = None) -> list:
+    """
+    Function to find the records to copy between two copies of a book.
+
+    Without a base a record missing in one copy is copied to it, with the base a
+    record changed in one copy only takes that change, deletion included. Records
+    changed in both copies differently are conflicts and are left as they are.
+
+    :return: (key, direction, description) of every differing record, the direction
+             is "A > B", "B > A" or "!" for a conflict
+    """
+    if base is None:
+        keys = ours.tree.diff(theirs.tree)
+    else:
+        keys = ours.tree.diff(base.tree) | theirs.tree.diff(base.tree)
+    changes = []
+    for key in sorted(keys):
+        mine, other = ours.tree.leaf(key), theirs.tree.leaf(key)
+        if mine == other:
+            continue
+        if base is None:
+            if other is None:
+                changes.append((key, "A > B", "only in A"))
+            elif mine is None:
+                changes.append((key, "B > A", "only in B"))
+            else:
+                changes.append((key, "!", "differs"))
+            continue
+        old = base.tree.leaf(key)
+        if other == old:
+            changes.append((key, "A > B", describe(mine, old) + " in A"))
+        elif mine == old:
+            changes.append((key, "B > A", describe(other, old) + " in B"))
+        else:
+            changes.append((key, "!", "changed in both"))
+    return changes
+
+
+def sync(ours: Copy, theirs: Copy, changes: list) -> None:
+    """
+    Function to copy the changes without conflicts and save both files.
+
+    :param changes: list returned by compare()
+    """
+    for key, direction, _ in changes:
+        if direction == "A > B":
+            theirs.take(ours, key)
+        elif direction == "B > A":
+            ours.take(theirs, key)
+    ours.save()
+    theirs.save()
+
+
+def show_changes(ours: Copy, theirs: Copy, changes: list) -> None:
+    """
+    Function to display the differing records of two copies.
+
+    :param changes: list returned by compare()
+    """
+    print(SEPARATOR)
+    if not changes:
+        print(
+            Color.GREEN + f"{INDENT}{'The copies are the same':<{FIELD}}|" + Color.RESET
+        )
+        return
+    for key, direction, description in changes:
+        line = f"{name_of(key, ours, theirs)}: {description}"
+        color = Color.YELLOW if direction == "!" else ""
+        print(color + f"|{direction:^{COLUMN_1}}|{line:<{FIELD}}|" + Color.RESET)
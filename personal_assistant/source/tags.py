@@ -0,0 +1,218 @@
+"""Module providing tag statistics of the notebook kept up to date with its changes"""
+
+import heapq
+import os
+import pickle
+from collections import Counter
+
+from source.constants import COLUMN_1, FIELD, INDENT, SEPARATOR, Color
+from source.events import BookRestored, RecordEvent
+from source.locking import file_lock
+
+TAGS = "source/tags.dat"
+TOP = 10
+session = {"tags": None, "notebook": None}
+
+
+class TagStats:
+    """
+    A class counting the notes of every tag and of every pair of tags.
+
+    The tags counted for every note are kept aside, so a change of a note reported
+    by the notebook costs O(tags of the note squared) however large the notebook
+    is; the order and the transactions the events come in don't matter, as every
+    event counts the note again as it is in the notebook. The counts are saved with
+    the version of the storage file, so they are shown without loading the notebook
+    while it isn't changed.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.pairs = {}
+        self.counted = {}
+
+    def watch(self, notebook) -> None:
+        """
+        A method that counts the tags of a notebook and keeps them up to date.
+        """
+
+        self.reload(notebook)
+        notebook.subscribe(self.update, RecordEvent, BookRestored)
+
+    def reload(self, notebook) -> None:
+        """
+        A method that counts all notes of the notebook again.
+        """
+
+        self.counts, self.pairs, self.counted = Counter(), {}, {}
+        for notice in notebook.data.values():
+            tags = frozenset(notice.give_all_tags())
+            if tags:
+                self.counted[notice.uid] = tags
+                self.add(tags, 1)
+
+    def add(self, tags: frozenset, step: int) -> None:
+        """
+        A method that adds or subtracts a note with the tags to the counts.
+        """
+
+        for tag in tags:
+            self.counts[tag] += step
+            if not self.counts[tag]:
+                del self.counts[tag]
+            related = self.pairs.setdefault(tag, Counter())
+            for other in tags:
+                if other != tag:
+                    related[other] += step
+                    if not related[other]:
+                        del related[other]
+            if not related:
+                del self.pairs[tag]
+
+    def update(self, event) -> None:
+        """
+        A method that counts a changed note again, called by the notebook.
+        """
+
+        if isinstance(event, BookRestored):
+            self.reload(event.book)
+            return
+        uid = event.record.uid
+        notice = event.book.data.get(uid)
+        tags = frozenset(notice.give_all_tags()) if notice is not None else frozenset()
+        old = self.counted.get(uid, frozenset())
+        if tags == old:
+            return
+        self.add(old, -1)
+        self.add(tags, 1)
+        if tags:
+            self.counted[uid] = tags
+        else:
+            self.counted.pop(uid, None)
+
+    def top(self, count: int = TOP) -> list:
+        """
+        A method that returns the tags of the most notes.
+
+        :return: (tag, number of notes) pairs, the most used first
+        """
+
+        return heapq.nsmallest(
+            count, self.counts.items(), key=lambda item: (-item[1], item[0])
+        )
+
+    def related(self, tag: str, count: int = TOP) -> list:
+        """
+        A method that returns the tags found together with a tag most often.
+
+        :return: (tag, number of notes with both) pairs, the most frequent first
+        """
+
+        return heapq.nsmallest(
+            count,
+            self.pairs.get(tag.lower(), {}).items(),
+            key=lambda item: (-item[1], item[0]),
+        )
+
+    def save(self, stamp, path: str = TAGS) -> None:
+        """
+        A method that writes the counts with the version of the storage file they
+        were counted from.
+        """
+
+        with file_lock(path, exclusive=True):
+            with open(path + ".tmp", "wb") as file:
+                pickle.dump((stamp, self.counts, self.pairs), file)
+            os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, stamp, path: str = TAGS):
+        """
+        A method that reads the saved counts if they were counted from the version
+        of the storage file.
+
+        :return: tag statistics without the counted notes, None if stale or missing
+        """
+
+        try:
+            with file_lock(path, exclusive=False), open(path, "rb") as file:
+                saved, counts, pairs = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        if saved is None or saved != stamp:
+            return None
+        stats = cls()
+        stats.counts, stats.pairs = counts, pairs
+        return stats
+
+
+def notes_of(count: int) -> str:
+    """
+    Function to write a number of notes.
+    """
+    return f"{count} note" if count == 1 else f"{count} notes"
+
+
+def show_tags(stats: TagStats, count: int = TOP) -> None:
+    """
+    Function to display the tags of the most notes.
+
+    :param stats: tag statistics
+    :param count: number of tags
+    """
+    print(SEPARATOR)
+    top = stats.top(count)
+    if not top:
+        print(f"{INDENT}{'There are no tags':<{FIELD}}|")
+        return
+    for number, (tag, notes) in enumerate(top):
+        line = f"{tag}: {notes_of(notes)}"
+        print(f"|{number + 1:^{COLUMN_1}}|{line:<{FIELD}}|")
+
+
+def show_related(stats: TagStats, tag: str, count: int = TOP) -> bool:
+    """
+    Function to display the tags found together with a tag.
+
+    :param stats: tag statistics
+    :param tag: tag
+    :param count: number of related tags
+    :return: False if no note has the tag
+    """
+    notes = stats.counts.get(tag.lower(), 0)
+    if not notes:
+        return False
+    print(SEPARATOR)
+    line = f"{tag.lower()}: {notes_of(notes)}"
+    print(f"|{'':^{COLUMN_1}}|{line:<{FIELD}}|")
+    for number, (other, together) in enumerate(stats.related(tag, count)):
+        line = f"with {other}: {notes_of(together)}"
+        print(f"|{number + 1:^{COLUMN_1}}|{line:<{FIELD}}|")
+    return True
+
+
+def session_stats() -> TagStats:
+    """
+    Function to get the tag statistics of the interactive session, counted on the
+    first use from the notebook put in the session.
+    """
+    if session["tags"] is None:
+        session["tags"] = TagStats()
+        session["tags"].watch(session["notebook"])
+    return session["tags"]
+
+
+def tags_command(_, tag: str | None = None, *__) -> None:
+    """
+    Function to list the most used tags or the tags related to one, as a menu command.
+    """
+    stats = session_stats()
+    if tag is None:
+        show_tags(stats)
+    elif not show_related(stats, tag):
+        print(SEPARATOR)
+        print(
+            Color.RED
+            + f"{INDENT}{'No note has the tag ' + tag:<{FIELD}}|"
+            + Color.RESET
+        )